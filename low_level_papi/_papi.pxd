@@ -0,0 +1,19 @@
+# Cython declarations for the PAPI calls used inside measurement loops.
+#
+#     from low_level_papi cimport _papi
+#
+# The declarations match papi.h, shipped next to this file. The functions
+# are resolved when the extension module is linked, see README.md.
+
+cdef extern from "papi.h" nogil:
+    enum:
+        PAPI_OK
+        PAPI_NULL
+
+    int PAPI_start(int EventSet)
+    int PAPI_stop(int EventSet, long long *values)
+    int PAPI_read(int EventSet, long long *values)
+    int PAPI_reset(int EventSet)
+    int PAPI_num_events(int EventSet)
+    long long PAPI_get_real_cyc()
+    long long PAPI_get_real_nsec()
@@ -1,13 +1,14 @@
 """
-Core functionality for the low_level_pipa module.
+Core functionality for the low_level_papi module.
 
 This module provides direct bindings to PAPI's low-level functions, making them
 accessible from Python with proper error handling and data conversion.
 """
 
-from ctypes import c_longlong, c_ulonglong
-import os
-import sys
+import atexit
+import functools
+import threading
+import time
 
 try:
     from ._papi import lib, ffi
@@ -15,25 +16,176 @@ except ModuleNotFoundError:
     raise ImportError(
         "The _papi module was not found. You need to build the CFFI module first.\n"
         "Try running:\n"
-        "    python -m low_level_pipa.papi_build\n"
+        "    python -m low_level_papi.papi_build\n"
         "or:\n"
         "    python setup.py build_ext --inplace\n"
         "from the project root directory."
     )
 
-from .exceptions import papi_error, PapiError
-from .consts import PAPI_VER_CURRENT, PAPI_NULL
+from .exceptions import papi_error, PapiError, _raise
+from .consts import (
+    PAPI_VER_CURRENT, PAPI_NULL, PAPI_MAX_MPX_CTRS, PAPI_FP_INS, PAPI_FP_OPS
+)
+from .events import PAPI_TOT_CYC, PAPI_TOT_INS
 from .structs import (
     EVENT_info, HARDWARE_info, DMEM_info, EXECUTABLE_info,
-    COMPONENT_info, SHARED_LIB_info, Flips, Flops, IPC
+    COMPONENT_info, SHARED_LIB_info, Flips, Flops, IPC, _HW_STRUCT
+)
+
+# Public functions, re-exported at the package top level
+__all__ = (
+    "library_init",
+    "shutdown",
+    "create_eventset",
+    "add_event",
+    "add_named_event",
+    "add_events",
+    "remove_event",
+    "remove_events",
+    "remove_named_event",
+    "list_events",
+    "num_events",
+    "start",
+    "stop",
+    "read",
+    "read_into",
+    "make_reader",
+    "alloc_counters",
+    "reset",
+    "counting",
+    "state",
+    "cleanup_eventset",
+    "destroy_eventset",
+    "get_event_info",
+    "event_code_to_name",
+    "event_name_to_code",
+    "enum_event",
+    "enum_all_events",
+    "num_components",
+    "get_component_info",
+    "get_hardware_info",
+    "get_executable_info",
+    "get_dmem_info",
+    "get_real_cyc",
+    "get_real_usec",
+    "get_real_nsec",
+    "get_virt_cyc",
+    "get_virt_usec",
+    "get_virt_nsec",
+    "get_real_cyc_fast",
+    "get_real_nsec_fast",
+    "get_virt_nsec_fast",
+    "get_virt_usec_fast",
+    "flops",
+    "flips",
+    "ipc",
+    "ipc_begin",
+    "ipc_end",
+    "epc",
+    "is_initialized",
+    "strerror",
 )
 
+# Functions used on the measurement path, bound once so that each call is a
+# global lookup instead of an attribute lookup on the cffi lib object.
+# The Python functions wrapping them check return codes inline instead of
+# going through the papi_error decorator.
+_PAPI_start = lib.PAPI_start
+_PAPI_stop = lib.PAPI_stop
+_PAPI_read = lib.PAPI_read
+_PAPI_reset = lib.PAPI_reset
+_PAPI_num_events = lib.PAPI_num_events
+_PAPI_get_real_cyc = lib.PAPI_get_real_cyc
+_PAPI_get_real_nsec = lib.PAPI_get_real_nsec
+_papi_read_n = lib._papi_read_n
+_papi_stop_n = lib._papi_stop_n
+_ffi_new = ffi.new
+_ffi_unpack = ffi.unpack
+_ffi_buffer = ffi.buffer
+_ffi_string = ffi.string
+_ffi_cast = ffi.cast
+_CData = ffi.CData
+
+# Bitfields of PAPI_component_info_t in the order
+# lib._papi_component_flags() packs them, as emitted by papi_build.py
+_COMPONENT_FLAGS = tuple(ffi.string(name).decode()
+                         for name in lib._papi_component_flag_names)
+
+# Per-thread scratch space reused across calls
+_tls = threading.local()
+
+
+def _values_buffer():
+    """Return the calling thread's result buffer for read() and stop().
+
+    It is sized for the largest possible event set when first used, so the
+    read/stop helpers never need a second call to size it.
+    """
+    try:
+        return _tls.values
+    except AttributeError:
+        _tls.values = values = _ffi_new("long long[]", PAPI_MAX_MPX_CTRS)
+        return values
+
+
+def _to_array(values, count):
+    """Copy the first count values of a long long buffer into a NumPy array.
+
+    The result is a copy, so it stays valid when the buffer is reused.
+    """
+    import numpy as np
+    return np.frombuffer(_ffi_buffer(values, count * 8), dtype=np.int64).copy()
+
+
+def _str(p):
+    """Decode a NUL-terminated PAPI string; PAPI names and descriptions are ASCII."""
+    return _ffi_string(p).decode('ascii')
+
+
+@functools.lru_cache(maxsize=256)
+def _event_name_buffer(eventName):
+    """Return a char buffer holding eventName, shared by all calls passing
+    the same name. PAPI only reads event names, so sharing is safe."""
+    return ffi.new("char[]", eventName.encode("ascii"))
+
+
+def _int_buffer():
+    """Return the calling thread's scratch int for single-int output arguments."""
+    try:
+        return _tls.int_p
+    except AttributeError:
+        _tls.int_p = int_p = _ffi_new("int*", 0)
+        return int_p
+
+
+def _rate_buffers():
+    """Return the calling thread's (rtime, ptime, count, rate) scratch
+    outputs shared by flips(), flops() and ipc()."""
+    try:
+        return _tls.rate
+    except AttributeError:
+        _tls.rate = rate = (
+            _ffi_new("float*", 0),
+            _ffi_new("float*", 0),
+            _ffi_new("long long*", 0),
+            _ffi_new("float*", 0),
+        )
+        return rate
+
+
+# Version returned by the first successful library_init(), None until then
+_init_version = None
+_atexit_registered = False
+
+
 @papi_error
 def library_init(version=PAPI_VER_CURRENT):
     """Initialize the PAPI library.
 
     This function must be called before any other PAPI functions can be used.
-    It may be called multiple times.
+    It may be called multiple times: only the first call initializes PAPI,
+    later calls return the cached version until shutdown() is called.
+    shutdown() is registered to run at interpreter exit.
 
     Parameters
     ----------
@@ -50,7 +202,16 @@ def library_init(version=PAPI_VER_CURRENT):
     PapiError
         If the initialization fails.
     """
+    global _init_version, _atexit_registered
+    if _init_version is not None:
+        return _init_version, _init_version
+
     rcode = lib.PAPI_library_init(version)
+    if rcode >= 0:
+        _init_version = rcode
+        if not _atexit_registered:
+            atexit.register(shutdown)
+            _atexit_registered = True
     return rcode, rcode
 
 
@@ -58,8 +219,23 @@ def shutdown():
     """Shut down the PAPI library.
 
     This function frees all memory and resources used by the PAPI library.
+    It does nothing if the library is not initialized, so an explicit call
+    and the one registered at exit do not both reach PAPI_shutdown().
     """
+    global _init_version, _ipc_es
+    if _init_version is None:
+        return
     lib.PAPI_shutdown()
+    _init_version = None
+    # Event sets and event names do not survive a shutdown
+    _ipc_es = None
+    _reset_caches()
+
+
+def _reset_caches():
+    """Forget the cached event code/name conversions."""
+    _event_code_to_name.cache_clear()
+    _event_name_to_code.cache_clear()
 
 
 @papi_error
@@ -89,9 +265,10 @@ def create_eventset():
     PapiError
         If the event set cannot be created.
     """
-    eventSet = ffi.new("int*", 0)
+    eventSet = _int_buffer()
+    eventSet[0] = PAPI_NULL
     rcode = lib.PAPI_create_eventset(eventSet)
-    return rcode, ffi.unpack(eventSet, 1)[0]
+    return rcode, eventSet[0]
 
 
 @papi_error
@@ -140,7 +317,7 @@ def add_named_event(eventSet, eventName):
     PapiError
         If the event cannot be added to the event set.
     """
-    eventName_p = ffi.new("char[]", eventName.encode("ascii"))
+    eventName_p = _event_name_buffer(eventName)
     rcode = lib.PAPI_add_named_event(eventSet, eventName_p)
     return rcode, None
 
@@ -218,7 +395,7 @@ def remove_named_event(eventSet, eventName):
     PapiError
         If the event cannot be removed from the event set.
     """
-    eventName_p = ffi.new("char[]", eventName.encode("ascii"))
+    eventName_p = _event_name_buffer(eventName)
     rcode = lib.PAPI_remove_named_event(eventSet, eventName_p)
     return rcode, None
 
@@ -269,18 +446,18 @@ def list_events(eventSet):
     PapiError
         If the events cannot be listed.
     """
-    number_p = ffi.new("int*", 0)
     rcode = lib.PAPI_num_events(eventSet)
     if rcode < 0:
         return rcode, []
 
     number = rcode
+    number_p = _int_buffer()
     number_p[0] = number
     events_p = ffi.new("int[]", number)
     rcode = lib.PAPI_list_events(eventSet, events_p, number_p)
     
     if rcode == 0:
-        return rcode, [events_p[i] for i in range(number)]
+        return rcode, ffi.unpack(events_p, number)
     else:
         return rcode, []
 
@@ -350,12 +527,12 @@ def destroy_eventset(eventSet):
     PapiError
         If the event set cannot be destroyed.
     """
-    eventSet_p = ffi.new("int*", eventSet)
+    eventSet_p = _int_buffer()
+    eventSet_p[0] = eventSet
     rcode = lib.PAPI_destroy_eventset(eventSet_p)
     return rcode, None
 
 
-@papi_error
 def start(eventSet):
     """Start counting hardware events in an event set.
 
@@ -374,75 +551,186 @@ def start(eventSet):
     PapiError
         If the event set cannot be started.
     """
-    rcode = lib.PAPI_start(eventSet)
-    return rcode, None
+    rcode = _PAPI_start(eventSet)
+    if rcode < 0:
+        _raise(rcode)
+    return rcode
 
 
-@papi_error
-def stop(eventSet):
+def stop(eventSet, as_array=False):
     """Stop counting hardware events in an event set.
 
     Parameters
     ----------
     eventSet : int
         Event set identifier.
+    as_array : bool, optional
+        Return the values as a NumPy int64 array instead of a list.
+        Requires NumPy.
 
     Returns
     -------
-    list of int
-        List of event values.
+    list of int or numpy.ndarray
+        Event values.
 
     Raises
     ------
     PapiError
         If the event set cannot be stopped.
     """
-    eventCount = lib.PAPI_num_events(eventSet)
-    if eventCount < 0:
-        return eventCount, []
-
-    values = ffi.new("long long[]", eventCount)
-    rcode = lib.PAPI_stop(eventSet, values)
+    values = _values_buffer()
+    rcode = _papi_stop_n(eventSet, values, PAPI_MAX_MPX_CTRS)
     
-    if rcode == 0:
-        return rcode, list(ffi.unpack(values, eventCount))
-    else:
-        return rcode, []
+    if rcode < 0:
+        _raise(rcode)
+    if as_array:
+        return _to_array(values, rcode)
+    return _ffi_unpack(values, rcode)
 
 
-@papi_error
-def read(eventSet):
+def read(eventSet, as_array=False):
     """Read hardware events from an event set without resetting.
 
     Parameters
     ----------
     eventSet : int
         Event set identifier.
+    as_array : bool, optional
+        Return the values as a NumPy int64 array instead of a list.
+        Requires NumPy.
 
     Returns
     -------
-    list of int
-        List of event values.
+    list of int or numpy.ndarray
+        Event values.
 
     Raises
     ------
     PapiError
         If the event set cannot be read.
     """
-    eventCount = lib.PAPI_num_events(eventSet)
-    if eventCount < 0:
-        return eventCount, []
-
-    values = ffi.new("long long[]", eventCount)
-    rcode = lib.PAPI_read(eventSet, values)
+    values = _values_buffer()
+    rcode = _papi_read_n(eventSet, values, PAPI_MAX_MPX_CTRS)
     
-    if rcode == 0:
-        return rcode, list(ffi.unpack(values, eventCount))
+    if rcode < 0:
+        _raise(rcode)
+    if as_array:
+        return _to_array(values, rcode)
+    return _ffi_unpack(values, rcode)
+
+
+def alloc_counters(n):
+    """Allocate a buffer for n event values, for use with read_into().
+
+    Parameters
+    ----------
+    n : int
+        Number of events in the event set the buffer will be read from.
+
+    Returns
+    -------
+    cdata
+        A ``long long[n]`` array owned by the caller.
+    """
+    return ffi.new("long long[]", n)
+
+
+def read_into(eventSet, values):
+    """Read hardware events from an event set into a caller-owned buffer.
+
+    This is the fast path for sampling loops. Unlike read(), no memory is
+    allocated, so the same buffer can be reused for every sample while the
+    event set keeps running. With NumPy, a ``(n_samples, n_events)`` int64
+    array can be filled one row per call.
+
+    Parameters
+    ----------
+    eventSet : int
+        Event set identifier.
+    values : cdata or numpy.ndarray
+        Buffer returned by alloc_counters(), or a writable C-contiguous
+        int64 NumPy array, with room for every event in the event set.
+
+    Returns
+    -------
+    int
+        Number of values written.
+
+    Raises
+    ------
+    ValueError
+        If values is a NumPy array of the wrong type or layout.
+    PapiError
+        If the event set cannot be read, or does not fit in values
+        (PapiBufferError).
+    """
+    if isinstance(values, _CData):
+        rcode = _papi_read_n(eventSet, values, len(values))
     else:
-        return rcode, []
+        rcode = _papi_read_n(eventSet, _array_pointer(values), values.size)
+    if rcode < 0:
+        _raise(rcode)
+    return rcode
+
+
+def make_reader(eventSet):
+    """Build a read function specialized for an event set.
+
+    The returned function takes no arguments and returns the current event
+    values as a tuple, like read() but with the event set, the buffer and
+    the number of events baked into generated code. This removes the
+    per-call sizing and list building for small, fixed event sets.
+
+    The reader returns as many values as the event set had when it was
+    built, and owns its buffer, so it should not be shared between threads.
+
+    Parameters
+    ----------
+    eventSet : int
+        Event set identifier.
+
+    Returns
+    -------
+    callable
+        Function returning a tuple of event values.
+
+    Raises
+    ------
+    PapiError
+        If the event set is invalid, or later when the reader cannot read it.
+    """
+    count = num_events(eventSet)
+    # Room for the largest event set, so PAPI cannot overrun the buffer
+    # even if events are added after the reader was built
+    values = _ffi_new("long long[]", PAPI_MAX_MPX_CTRS)
+    items = "".join(f"_values[{i}], " for i in range(count))
+    source = (
+        "def reader(_read=_PAPI_read, _eventSet=eventSet, _values=values, _raise=_raise):\n"
+        "    rcode = _read(_eventSet, _values)\n"
+        "    if rcode < 0:\n"
+        "        _raise(rcode)\n"
+        f"    return ({items})\n"
+    )
+    namespace = {
+        "_PAPI_read": _PAPI_read,
+        "_raise": _raise,
+        "eventSet": eventSet,
+        "values": values,
+    }
+    exec(source, namespace)
+    return namespace["reader"]
+
+
+def _array_pointer(array):
+    """Return a long long pointer to the data of an int64 NumPy array."""
+    dtype, flags = array.dtype, array.flags
+    if dtype.kind != "i" or dtype.itemsize != 8 or not dtype.isnative:
+        raise ValueError(f"expected an int64 array, got {dtype}")
+    if not (flags.c_contiguous and flags.writeable):
+        raise ValueError("expected a writable C-contiguous array")
+    return _ffi_cast("long long *", array.__array_interface__["data"][0])
 
 
-@papi_error
 def reset(eventSet):
     """Reset the hardware event counts in an event set.
 
@@ -461,8 +749,73 @@ def reset(eventSet):
     PapiError
         If the event set cannot be reset.
     """
-    rcode = lib.PAPI_reset(eventSet)
-    return rcode, None
+    rcode = _PAPI_reset(eventSet)
+    if rcode < 0:
+        _raise(rcode)
+    return rcode
+
+
+class _Counting:
+    """Context manager returned by counting()."""
+    __slots__ = ("es", "buf")
+
+    def __init__(self, eventSet):
+        self.es = eventSet
+        self.buf = None
+
+    def __enter__(self):
+        eventCount = _PAPI_num_events(self.es)
+        if eventCount < 0:
+            _raise(eventCount)
+
+        # Allocate the result buffer before counting starts, so that the
+        # stop path is a single call into PAPI
+        self.buf = _ffi_new("long long[]", eventCount)
+        rcode = _PAPI_start(self.es)
+        if rcode < 0:
+            _raise(rcode)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        rcode = _PAPI_stop(self.es, self.buf)
+        # Do not mask an exception raised inside the block
+        if rcode < 0 and exc_type is None:
+            _raise(rcode)
+        return False
+
+    @property
+    def values(self):
+        """Event values recorded when the block exited, as a memoryview of int64."""
+        return memoryview(ffi.buffer(self.buf)).cast("q")
+
+
+def counting(eventSet):
+    """Count the events of an event set for the duration of a with block.
+
+    The event set is started on entry and stopped on exit. The values are
+    available afterwards through the ``values`` attribute of the object
+    bound by ``as``::
+
+        with counting(eventSet) as counts:
+            ...
+        cycles, instructions = counts.values
+
+    Parameters
+    ----------
+    eventSet : int
+        Event set identifier.
+
+    Returns
+    -------
+    context manager
+        Object whose ``values`` attribute holds the event values.
+
+    Raises
+    ------
+    PapiError
+        If the event set cannot be started or stopped.
+    """
+    return _Counting(eventSet)
 
 
 @papi_error
@@ -484,9 +837,10 @@ def state(eventSet):
     PapiError
         If the state cannot be determined.
     """
-    status = ffi.new("int*", 0)
+    status = _int_buffer()
+    status[0] = 0
     rcode = lib.PAPI_state(eventSet, status)
-    return rcode, ffi.unpack(status, 1)[0]
+    return rcode, status[0]
 
 
 @papi_error
@@ -512,35 +866,17 @@ def get_event_info(eventCode):
     rcode = lib.PAPI_get_event_info(eventCode, info)
     
     if rcode == 0:
-        return rcode, EVENT_info(
-            event_code=info.event_code,
-            symbol=ffi.string(info.symbol).decode('utf-8'),
-            short_descr=ffi.string(info.short_descr).decode('utf-8'),
-            long_descr=ffi.string(info.long_descr).decode('utf-8'),
-            component_index=info.component_index,
-            units=ffi.string(info.units).decode('utf-8'),
-            location=info.location,
-            data_type=info.data_type,
-            value_type=info.value_type,
-            timescope=info.timescope,
-            update_type=info.update_type,
-            update_freq=info.update_freq,
-            count=info.count,
-            event_type=info.event_type,
-            derived=ffi.string(info.derived).decode('utf-8'),
-            postfix=ffi.string(info.postfix).decode('utf-8'),
-            code=[info.code[i] for i in range(info.count)],
-            name=[ffi.string(info.name[i]).decode('utf-8') for i in range(info.count)],
-            note=ffi.string(info.note).decode('utf-8')
-        )
+        return rcode, EVENT_info(info)
     else:
         return rcode, None
 
 
-@papi_error
 def event_code_to_name(eventCode):
     """Convert a PAPI event code to a name.
 
+    Results are cached until shutdown(), since the mapping does not change
+    while the library is initialized.
+
     Parameters
     ----------
     eventCode : int
@@ -556,6 +892,12 @@ def event_code_to_name(eventCode):
     PapiError
         If the event code cannot be converted.
     """
+    return _event_code_to_name(eventCode)
+
+
+@functools.lru_cache(maxsize=1024)
+@papi_error
+def _event_code_to_name(eventCode):
     name = ffi.new("char[]", 256)  # PAPI_MAX_STR_LEN
     rcode = lib.PAPI_event_code_to_name(eventCode, name)
     
@@ -565,10 +907,12 @@ def event_code_to_name(eventCode):
         return rcode, None
 
 
-@papi_error
 def event_name_to_code(eventName):
     """Convert a PAPI event name to a code.
 
+    Results are cached until shutdown(), since the mapping does not change
+    while the library is initialized.
+
     Parameters
     ----------
     eventName : str
@@ -584,12 +928,19 @@ def event_name_to_code(eventName):
     PapiError
         If the event name cannot be converted.
     """
-    eventName_p = ffi.new("char[]", eventName.encode("ascii"))
-    code = ffi.new("int*", 0)
+    return _event_name_to_code(eventName)
+
+
+@functools.lru_cache(maxsize=1024)
+@papi_error
+def _event_name_to_code(eventName):
+    eventName_p = _event_name_buffer(eventName)
+    code = _int_buffer()
+    code[0] = 0
     rcode = lib.PAPI_event_name_to_code(eventName_p, code)
     
     if rcode == 0:
-        return rcode, ffi.unpack(code, 1)[0]
+        return rcode, code[0]
     else:
         return rcode, None
 
@@ -615,15 +966,53 @@ def enum_event(eventCode, modifier=0):
     PapiError
         If there are no more events to enumerate.
     """
-    eventCode_p = ffi.new("int*", eventCode)
+    eventCode_p = _int_buffer()
+    eventCode_p[0] = eventCode
     rcode = lib.PAPI_enum_event(eventCode_p, modifier)
     
     if rcode == 0:
-        return rcode, ffi.unpack(eventCode_p, 1)[0]
+        return rcode, eventCode_p[0]
     else:
         return rcode, None
 
 
+@papi_error
+def enum_all_events(modifier, start=0):
+    """Enumerate all PAPI events following the given one.
+
+    Equivalent to calling enum_event() repeatedly until it runs out of
+    events, but the walk happens in a single call into the C library.
+
+    Parameters
+    ----------
+    modifier : int
+        A modifier to control how the enumeration is done.
+    start : int, optional
+        The PAPI event code to start from.
+
+    Returns
+    -------
+    list of int
+        The event codes after start, in enumeration order.
+
+    Raises
+    ------
+    PapiError
+        If the enumeration fails for a reason other than reaching the end
+        of the event list.
+    """
+    count = _int_buffer()
+    capacity = 1024
+    while True:
+        codes = ffi.new("int[]", capacity)
+        rcode = lib._papi_enum_all(start, modifier, codes, capacity, count)
+        if rcode < 0:
+            return rcode, None
+        if count[0] <= capacity:
+            return rcode, _ffi_unpack(codes, count[0])
+        capacity = count[0]
+
+
 @papi_error
 def num_components():
     """Get the number of components available in the PAPI library.
@@ -666,20 +1055,22 @@ def get_component_info(cidx):
     if info == ffi.NULL:
         return -1, None
     
+    flags = lib._papi_component_flags(info)
     pmu_names = []
-    for i in range(40):  # PAPI_PMU_MAX
-        if info.pmu_names[i] == ffi.NULL:
+    null = ffi.NULL
+    for name in _ffi_unpack(info.pmu_names, len(info.pmu_names)):
+        if name == null:
             break
-        pmu_names.append(ffi.string(info.pmu_names[i]).decode('utf-8'))
+        pmu_names.append(_str(name))
     
     return 0, COMPONENT_info(
-        name=ffi.string(info.name).decode('utf-8'),
-        short_name=ffi.string(info.short_name).decode('utf-8'),
-        description=ffi.string(info.description).decode('utf-8'),
-        version=ffi.string(info.version).decode('utf-8'),
-        support_version=ffi.string(info.support_version).decode('utf-8'),
-        kernel_version=ffi.string(info.kernel_version).decode('utf-8'),
-        disabled_reason=ffi.string(info.disabled_reason).decode('utf-8'),
+        name=_str(info.name),
+        short_name=_str(info.short_name),
+        description=_str(info.description),
+        version=_str(info.version),
+        support_version=_str(info.support_version),
+        kernel_version=_str(info.kernel_version),
+        disabled_reason=_str(info.disabled_reason),
         disabled=info.disabled,
         cmp_idx=info.CmpIdx,
         num_cntrs=info.num_cntrs,
@@ -692,24 +1083,8 @@ def get_component_info(cidx):
         available_granularities=info.available_granularities,
         hardware_intr_sig=info.hardware_intr_sig,
         pmu_names=pmu_names,
-        hardware_intr=bool(info.hardware_intr),
-        precise_intr=bool(info.precise_intr),
-        posix1b_timers=bool(info.posix1b_timers),
-        kernel_profile=bool(info.kernel_profile),
-        kernel_multiplex=bool(info.kernel_multiplex),
-        data_address_range=bool(info.data_address_range),
-        instr_address_range=bool(info.instr_address_range),
-        fast_counter_read=bool(info.fast_counter_read),
-        fast_real_timer=bool(info.fast_real_timer),
-        fast_virtual_timer=bool(info.fast_virtual_timer),
-        attach=bool(info.attach),
-        attach_must_ptrace=bool(info.attach_must_ptrace),
-        edge_detect=bool(info.edge_detect),
-        invert=bool(info.invert),
-        read_reset=bool(info.read_reset),
-        inherit=bool(info.inherit),
-        cpu=bool(info.cpu),
-        cntr_umasks=bool(info.cntr_umasks)
+        **{name: bool(flags >> bit & 1)
+           for bit, name in enumerate(_COMPONENT_FLAGS)}
     )
 
 
@@ -732,24 +1107,12 @@ def get_hardware_info():
     if info == ffi.NULL:
         return -1, None
     
-    return 0, HARDWARE_info(
-        ncpu=info.ncpu,
-        threads=info.threads,
-        cores=info.cores,
-        sockets=info.sockets,
-        nnodes=info.nnodes,
-        totalcpus=info.totalcpus,
-        vendor=info.vendor,
-        vendor_string=ffi.string(info.vendor_string).decode('utf-8'),
-        model=info.model,
-        model_string=ffi.string(info.model_string).decode('utf-8'),
-        revision=info.revision,
-        cpuid_family=info.cpuid_family,
-        cpuid_model=info.cpuid_model,
-        cpuid_stepping=info.cpuid_stepping,
-        cpu_max_mhz=info.cpu_max_mhz,
-        cpu_min_mhz=info.cpu_min_mhz
-    )
+    fields = list(_HW_STRUCT.unpack(_ffi_buffer(info, _HW_STRUCT.size)))
+    # The unpacked strings are NUL padded bytes; decode them like every
+    # other PAPI string
+    fields[7] = _str(info.vendor_string)
+    fields[9] = _str(info.model_string)
+    return 0, HARDWARE_info(*fields)
 
 
 @papi_error
@@ -823,7 +1186,6 @@ def get_dmem_info():
         return rcode, None
 
 
-@papi_error
 def get_real_cyc():
     """Get real (wall-clock) cycle count.
 
@@ -837,11 +1199,12 @@ def get_real_cyc():
     PapiError
         If the cycle count cannot be obtained.
     """
-    rcode = lib.PAPI_get_real_cyc()
-    return 0, rcode
+    value = _PAPI_get_real_cyc()
+    if value < 0:
+        _raise(value)
+    return value
 
 
-@papi_error
 def get_real_nsec():
     """Get real time in nanoseconds.
 
@@ -855,8 +1218,10 @@ def get_real_nsec():
     PapiError
         If the time cannot be obtained.
     """
-    rcode = lib.PAPI_get_real_nsec()
-    return 0, rcode
+    value = _PAPI_get_real_nsec()
+    if value < 0:
+        _raise(value)
+    return value
 
 
 @papi_error
@@ -931,6 +1296,15 @@ def get_virt_usec():
     return 0, rcode
 
 
+# Unchecked timer reads for timing loops: the PAPI functions themselves,
+# returning the raw 64-bit value with no Python wrapper and no error check.
+# get_real_cyc() and get_real_nsec() check inline for a negative PAPI error.
+get_real_cyc_fast = lib.PAPI_get_real_cyc
+get_real_nsec_fast = lib.PAPI_get_real_nsec
+get_virt_nsec_fast = lib.PAPI_get_virt_nsec
+get_virt_usec_fast = lib.PAPI_get_virt_usec
+
+
 @papi_error
 def flips(event=0):
     """Get floating point instruction rate.
@@ -938,7 +1312,8 @@ def flips(event=0):
     Parameters
     ----------
     event : int, optional
-        The event to use for the measurement.
+        The event to use for the measurement: PAPI_FP_INS (the default),
+        PAPI_VEC_SP or PAPI_VEC_DP.
 
     Returns
     -------
@@ -950,20 +1325,18 @@ def flips(event=0):
     PapiError
         If the measurement cannot be obtained.
     """
-    rtime = ffi.new("float*", 0)
-    ptime = ffi.new("float*", 0)
-    flpins = ffi.new("long long*", 0)
-    mflips = ffi.new("float*", 0)
+    rtime, ptime, flpins, mflips = _rate_buffers()
 
-    rcode = lib.PAPI_flips(rtime, ptime, flpins, mflips)
+    rcode = lib.PAPI_flips_rate(event or PAPI_FP_INS, rtime, ptime,
+                                flpins, mflips)
 
     if rcode == 0:
         return rcode, Flips(
             event_name="PAPI_FP_INS" if event == 0 else event_code_to_name(event),
-            real_time=ffi.unpack(rtime, 1)[0],
-            proc_time=ffi.unpack(ptime, 1)[0],
-            flpins=ffi.unpack(flpins, 1)[0],
-            mflips=ffi.unpack(mflips, 1)[0]
+            real_time=rtime[0],
+            proc_time=ptime[0],
+            flpins=flpins[0],
+            mflips=mflips[0]
         )
     else:
         return rcode, None
@@ -976,7 +1349,8 @@ def flops(event=0):
     Parameters
     ----------
     event : int, optional
-        The event to use for the measurement.
+        The event to use for the measurement: PAPI_FP_OPS (the default),
+        PAPI_SP_OPS or PAPI_DP_OPS.
 
     Returns
     -------
@@ -988,20 +1362,18 @@ def flops(event=0):
     PapiError
         If the measurement cannot be obtained.
     """
-    rtime = ffi.new("float*", 0)
-    ptime = ffi.new("float*", 0)
-    flpops = ffi.new("long long*", 0)
-    mflops = ffi.new("float*", 0)
+    rtime, ptime, flpops, mflops = _rate_buffers()
 
-    rcode = lib.PAPI_flops(rtime, ptime, flpops, mflops)
+    rcode = lib.PAPI_flops_rate(event or PAPI_FP_OPS, rtime, ptime,
+                                flpops, mflops)
 
     if rcode == 0:
         return rcode, Flops(
             event_name="PAPI_FP_OPS" if event == 0 else event_code_to_name(event),
-            real_time=ffi.unpack(rtime, 1)[0],
-            proc_time=ffi.unpack(ptime, 1)[0],
-            flpops=ffi.unpack(flpops, 1)[0],
-            mflops=ffi.unpack(mflops, 1)[0]
+            real_time=rtime[0],
+            proc_time=ptime[0],
+            flpops=flpops[0],
+            mflops=mflops[0]
         )
     else:
         return rcode, None
@@ -1011,6 +1383,9 @@ def flops(event=0):
 def ipc():
     """Get instructions per cycle.
 
+    The first call in a thread starts the measurement and returns zeros;
+    each later call reports the interval since the previous call.
+
     Returns
     -------
     IPC
@@ -1021,19 +1396,82 @@ def ipc():
     PapiError
         If the measurement cannot be obtained.
     """
-    rtime = ffi.new("float*", 0)
-    ptime = ffi.new("float*", 0)
-    ins = ffi.new("long long*", 0)
-    ipc = ffi.new("float*", 0)
+    rtime, ptime, ins, ipc = _rate_buffers()
 
     rcode = lib.PAPI_ipc(rtime, ptime, ins, ipc)
 
     if rcode == 0:
         return rcode, IPC(
-            real_time=ffi.unpack(rtime, 1)[0],
-            proc_time=ffi.unpack(ptime, 1)[0],
-            ins=ffi.unpack(ins, 1)[0],
-            ipc=ffi.unpack(ipc, 1)[0]
+            real_time=rtime[0],
+            proc_time=ptime[0],
+            ins=ins[0],
+            ipc=ipc[0]
+        )
+    else:
+        return rcode, None
+
+
+# State shared by ipc_begin() and ipc_end(). The event set is created on
+# the first ipc_begin() and then kept running until shutdown().
+_ipc_es = None
+_ipc_values = None
+_ipc_real_t0 = 0
+_ipc_proc_t0 = 0
+
+
+def ipc_begin():
+    """Start an instructions-per-cycle measurement ended by ipc_end().
+
+    The first call creates an event set counting PAPI_TOT_CYC and
+    PAPI_TOT_INS and starts it; later calls only reset its counters, so
+    repeated measurements do not pay for event set setup.
+
+    Raises
+    ------
+    PapiError
+        If the event set cannot be created, started or reset.
+    """
+    global _ipc_es, _ipc_values, _ipc_real_t0, _ipc_proc_t0
+    if _ipc_es is None:
+        eventSet = create_eventset()
+        add_events(eventSet, [PAPI_TOT_CYC, PAPI_TOT_INS])
+        start(eventSet)
+        _ipc_values = ffi.new("long long[]", 2)
+        _ipc_es = eventSet
+    else:
+        reset(_ipc_es)
+    _ipc_real_t0 = time.perf_counter_ns()
+    _ipc_proc_t0 = time.process_time_ns()
+
+
+@papi_error
+def ipc_end():
+    """Finish the measurement started by the last ipc_begin().
+
+    Returns
+    -------
+    IPC
+        Instructions per cycle since the last ipc_begin().
+
+    Raises
+    ------
+    PapiError
+        If no measurement was started or the counters cannot be read.
+    """
+    if _ipc_es is None:
+        return lib.PAPI_ENOTRUN, None
+
+    rcode = _PAPI_read(_ipc_es, _ipc_values)
+    real_t1 = time.perf_counter_ns()
+    proc_t1 = time.process_time_ns()
+
+    if rcode == 0:
+        cycles, ins = _ipc_values[0], _ipc_values[1]
+        return rcode, IPC(
+            real_time=(real_t1 - _ipc_real_t0) / 1e9,
+            proc_time=(proc_t1 - _ipc_proc_t0) / 1e9,
+            ins=ins,
+            ipc=ins / cycles if cycles > 0 else 0.0
         )
     else:
         return rcode, None
@@ -0,0 +1,1074 @@
+#define _GNU_SOURCE
+#include <stdlib.h>
+#include <stddef.h>
+#include <time.h>
+#include <string.h>
+#include <stdio.h>
+#include <unistd.h>
+#include <sys/time.h>
+#include <sys/resource.h>
+#include <sys/types.h>
+#include <fcntl.h>
+#include <errno.h>
+#include <sys/ioctl.h>
+#include <sys/mman.h>
+#include <sys/syscall.h>
+#include <linux/perf_event.h>
+#include <pthread.h>
+#include "papi.h"
+
+/* Global state */
+static int papi_initialized = 0;
+static pid_t cached_pid;
+static int perf_available = -1; /* -1 not probed, 0 blocked, 1 usable */
+static int perf_errno;          /* why the probe in PAPI_library_init failed */
+
+/* Event set data, kept as parallel arrays indexed by event set id so the
+   read loop only touches the event codes and start values it needs */
+#define MAX_EVENTS 10
+#define MAX_EVENT_SETS 32   /* one bit per event set in es_free */
+static int es_num_events[MAX_EVENT_SETS];
+static int es_running[MAX_EVENT_SETS];
+static int es_events[MAX_EVENT_SETS][MAX_EVENTS];
+static long long es_start[MAX_EVENT_SETS][MAX_EVENTS];
+
+/* Readers for events without a perf_event counter, resolved when the event
+   is added: one for the start of a region and one for later reads */
+typedef long long (*read_fn_t)(void);
+static read_fn_t es_begin_fn[MAX_EVENT_SETS][MAX_EVENTS];
+static read_fn_t es_read_fn[MAX_EVENT_SETS][MAX_EVENTS];
+
+/* perf_event state of an event set, used when counters are opened, reset
+   or read through the kernel */
+typedef struct {
+    int fds[MAX_EVENTS];          /* perf_event fd per event, -1 if none */
+    struct perf_event_mmap_page *pages[MAX_EVENTS]; /* mapped fd, or NULL */
+    int group_idx[MAX_EVENTS];    /* position of the fd in the group read */
+    int leader_fd;                /* first perf_event fd, -1 if none */
+    int group_size;               /* number of perf_event fds in the group */
+} PerfGroup;
+static PerfGroup es_perf[MAX_EVENT_SETS];
+
+/* Bit i is set while event set i is free. 0 is never handed out since it
+   is not a valid event set */
+#define ES_ALL_FREE 0xFFFFFFFEu
+static unsigned int es_free = ES_ALL_FREE;
+
+/* Per-thread baselines for PAPI_ipc and PAPI_epc. Each call reports the
+   interval since the previous one, the first call only records the
+   baseline. The state is dropped when the thread exits and, through the
+   generation count, on the next call after PAPI_shutdown */
+typedef struct {
+    int valid;
+    int event;                    /* event counted into base_evt */
+    int fd;                       /* perf_event counter for event, -1 if none */
+    unsigned int generation;      /* rate_generation when the fd was opened */
+    long long base_cyc, base_evt;
+    struct timespec base_ts;
+    struct rusage base_ru;
+} RateState;
+
+enum { RATE_IPC, RATE_EPC, NUM_RATES };
+static __thread RateState rate_states[NUM_RATES] = { { .fd = -1 }, { .fd = -1 } };
+static unsigned int rate_generation;
+static pthread_key_t rate_key;
+static pthread_once_t rate_key_once = PTHREAD_ONCE_INIT;
+
+static void rate_state_release(RateState *rs) {
+    if (rs->fd >= 0) close(rs->fd);
+    rs->fd = -1;
+    rs->valid = 0;
+}
+
+static void rate_states_release(void *p) {
+    RateState *states = p;
+
+    for (int i = 0; i < NUM_RATES; i++) rate_state_release(&states[i]);
+}
+
+static void rate_key_create(void) {
+    pthread_key_create(&rate_key, rate_states_release);
+}
+
+/* Timer reads are a handful of instructions and sit inside measured
+   regions, so force them inline rather than leave it to the optimizer */
+#define ALWAYS_INLINE static inline __attribute__((always_inline))
+
+/* Clock for real time readings. CLOCK_MONOTONIC_RAW is not slewed by NTP,
+   so intervals measured across an adjustment are not stretched or shrunk */
+#ifdef CLOCK_MONOTONIC_RAW
+#define REAL_CLOCK CLOCK_MONOTONIC_RAW
+#else
+#define REAL_CLOCK CLOCK_MONOTONIC
+#endif
+
+/* Perf-related constants */
+#define TSC_CYCLES 0
+#define INSTRUCTIONS 1
+
+/* Preset event codes, matching events.py */
+#define PAPI_TOT_INS ((int)(PAPI_PRESET_MASK | 0x32))
+#define PAPI_TOT_CYC ((int)(PAPI_PRESET_MASK | 0x3B))
+
+/* Utility functions */
+#ifdef __x86_64__
+/* Read the TSC at the start of a measured region. The fences keep earlier
+   loads and stores from being reordered past the read */
+ALWAYS_INLINE unsigned long long rdtsc_begin(void) {
+    unsigned int lo, hi;
+    __asm__ __volatile__ ("mfence\n\tlfence\n\trdtsc" : "=a" (lo), "=d" (hi) :: "memory");
+    return ((unsigned long long)hi << 32) | lo;
+}
+
+/* Read the TSC at the end of a measured region. rdtscp waits for earlier
+   instructions to retire and the lfence keeps later ones from starting */
+ALWAYS_INLINE unsigned long long rdtsc_end(void) {
+    unsigned int lo, hi;
+    __asm__ __volatile__ ("rdtscp\n\tlfence" : "=a" (lo), "=d" (hi) :: "%rcx", "memory");
+    return ((unsigned long long)hi << 32) | lo;
+}
+#endif
+
+#ifdef __aarch64__
+/* Read the generic timer's virtual count. The isb keeps the read from
+   being executed ahead of earlier instructions */
+ALWAYS_INLINE long long read_cntvct(void) {
+    unsigned long long v;
+    __asm__ __volatile__ ("isb\n\tmrs %0, cntvct_el0" : "=r" (v) :: "memory");
+    return (long long)v;
+}
+#endif
+
+/* Other targets have no portable user space cycle counter, so count
+   nanoseconds instead */
+ALWAYS_INLINE long long get_cycles_fallback(void) {
+    struct timespec ts;
+    clock_gettime(REAL_CLOCK, &ts);
+    return ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+/* Cycle count taken when a region starts */
+ALWAYS_INLINE long long get_cycles_begin(void) {
+    #if defined(__x86_64__)
+    return (long long)rdtsc_begin();
+    #elif defined(__aarch64__)
+    return read_cntvct();
+    #else
+    return get_cycles_fallback();
+    #endif
+}
+
+/* Cycle count taken when a region ends, also used for single readings */
+ALWAYS_INLINE long long get_cycles(void) {
+    #if defined(__x86_64__)
+    return (long long)rdtsc_end();
+    #elif defined(__aarch64__)
+    return read_cntvct();
+    #else
+    return get_cycles_fallback();
+    #endif
+}
+
+ALWAYS_INLINE long long get_usec(void) {
+    struct timespec ts;
+    clock_gettime(REAL_CLOCK, &ts);
+    return ts.tv_sec * 1000000LL + ts.tv_nsec / 1000;
+}
+
+/* Get accurate CPU instructions using Linux perf if available */
+static long long get_instructions() {
+    long long result = 0;
+    int found = 0;
+    FILE *fp;
+    char filename[256];
+    char line[1024];
+    
+    /* Try to get instructions from kernel counters */
+    snprintf(filename, sizeof(filename), "/proc/%d/stat", cached_pid);
+    fp = fopen(filename, "r");
+    if (fp) {
+        if (fgets(line, sizeof(line), fp)) {
+            /* utime and stime are fields 14 and 15. Scan from the closing
+               paren of comm, which may itself contain spaces, so that the
+               field after it is field 3 */
+            char *p = strrchr(line, ')');
+            long utime, stime;
+            for (int i = 2; p && i < 14; i++) {
+                p = strchr(p + 1, ' ');
+            }
+            if (p && sscanf(p, "%ld %ld", &utime, &stime) == 2) {
+                /* Estimate instructions based on CPU time */
+                result = (utime + stime) * 1000000LL;
+                found = 1;
+            }
+        }
+        fclose(fp);
+    }
+    
+    /* If we couldn't get a value, use cycles as an approximation. A new
+       process may well have used no CPU time yet, so zero is a value */
+    if (!found) {
+        result = get_cycles();
+    }
+    
+    return result;
+}
+
+/* Open a perf_event counter for the calling thread, disabled until started,
+   joining the group led by group_fd unless it is -1. Returns the fd, or -1
+   if the kernel or hardware does not provide it */
+static int open_perf_counter(unsigned int type, unsigned long long config,
+                             int group_fd, unsigned long long read_format) {
+    struct perf_event_attr attr;
+
+    if (!perf_available) return -1;
+    memset(&attr, 0, sizeof(attr));
+    attr.size = sizeof(attr);
+    attr.type = type;
+    attr.config = config;
+    attr.read_format = read_format;
+    attr.disabled = 1;
+    attr.exclude_kernel = 1;
+    attr.exclude_hv = 1;
+    return (int)syscall(__NR_perf_event_open, &attr, 0, -1, group_fd, 0);
+}
+
+/* Open the perf_event counter backing event i of an event set, if it has
+   one, in the set's group so that one read() returns all counters, and map
+   its control page so reads can use rdpmc instead of a read() syscall */
+static void open_event_counter(int slot, int i) {
+    PerfGroup *pg = &es_perf[slot];
+
+    pg->fds[i] = -1;
+    pg->pages[i] = NULL;
+    if (es_events[slot][i] == PAPI_TOT_INS)
+        pg->fds[i] = open_perf_counter(PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS,
+                                       pg->leader_fd, PERF_FORMAT_GROUP);
+    if (pg->fds[i] < 0) return;
+
+    if (pg->leader_fd < 0) pg->leader_fd = pg->fds[i];
+    pg->group_idx[i] = pg->group_size++;
+
+    void *page = mmap(NULL, sysconf(_SC_PAGESIZE), PROT_READ, MAP_SHARED, pg->fds[i], 0);
+    if (page != MAP_FAILED) pg->pages[i] = page;
+}
+
+/* Read a counter from user space with rdpmc, following the seqlock protocol
+   in perf_event_open(2). Returns 0 if the kernel does not allow it or the
+   counter is not currently scheduled on the PMU */
+static int rdpmc_counter(struct perf_event_mmap_page *pc, long long *value) {
+#if defined(__x86_64__) || defined(__i386__)
+    unsigned int seq, idx;
+    long long count;
+
+    do {
+        seq = pc->lock;
+        __asm__ __volatile__ ("" ::: "memory");
+        idx = pc->index;
+        if (!pc->cap_user_rdpmc || idx == 0) return 0;
+        count = pc->offset;
+
+        unsigned int lo, hi;
+        __asm__ __volatile__ ("rdpmc" : "=a" (lo), "=d" (hi) : "c" (idx - 1));
+        /* The hardware counter is pmc_width bits wide, sign extend it */
+        int shift = 64 - pc->pmc_width;
+        long long pmc = (long long)(((unsigned long long)hi << 32) | lo);
+        count += (long long)((unsigned long long)pmc << shift) >> shift;
+        __asm__ __volatile__ ("" ::: "memory");
+    } while (pc->lock != seq);
+
+    *value = count;
+    return 1;
+#else
+    (void)pc;
+    (void)value;
+    return 0;
+#endif
+}
+
+static long long read_perf_counter(int fd, struct perf_event_mmap_page *pc) {
+    long long value = 0;
+    if (pc && rdpmc_counter(pc, &value)) return value;
+    if (read(fd, &value, sizeof(value)) != sizeof(value)) return 0;
+    return value;
+}
+
+static void close_perf_counters(int slot) {
+    PerfGroup *pg = &es_perf[slot];
+
+    for (int i = 0; i < es_num_events[slot]; i++) {
+        if (pg->pages[i]) munmap(pg->pages[i], sysconf(_SC_PAGESIZE));
+        if (pg->fds[i] >= 0) close(pg->fds[i]);
+        pg->pages[i] = NULL;
+        pg->fds[i] = -1;
+    }
+    pg->leader_fd = -1;
+    pg->group_size = 0;
+}
+
+/* Readers used by events that have no perf_event counter */
+static const struct {
+    int code;
+    read_fn_t begin;
+    read_fn_t read;
+} EVENT_TABLE[] = {
+    { PAPI_TOT_CYC, get_cycles_begin, get_cycles },
+    { PAPI_TOT_INS, get_instructions, get_instructions },
+};
+
+/* Pick the readers of event i. Unknown events use the cycle counter */
+static void resolve_event(int slot, int i) {
+    int event = es_events[slot][i];
+
+    es_begin_fn[slot][i] = get_cycles_begin;
+    es_read_fn[slot][i] = get_cycles;
+    for (size_t k = 0; k < sizeof(EVENT_TABLE) / sizeof(EVENT_TABLE[0]); k++) {
+        if (EVENT_TABLE[k].code == event) {
+            es_begin_fn[slot][i] = EVENT_TABLE[k].begin;
+            es_read_fn[slot][i] = EVENT_TABLE[k].read;
+            break;
+        }
+    }
+}
+
+/* Current raw values of all events. perf_event counters are read with
+   rdpmc where possible, otherwise with a single read() of the group */
+static void read_events(int slot, long long *now) {
+    PerfGroup *pg = &es_perf[slot];
+    int n = es_num_events[slot];
+    int need_group = 0;
+
+    for (int i = 0; i < n; i++) {
+        if (pg->fds[i] < 0) {
+            /* Call the cycle counter directly so it is inlined here; the
+               pointer is only followed for the slower readers */
+            read_fn_t fn = es_read_fn[slot][i];
+            now[i] = fn == get_cycles ? get_cycles() : fn();
+        } else if (!pg->pages[i] || !rdpmc_counter(pg->pages[i], &now[i])) {
+            need_group = 1;
+        }
+    }
+    if (!need_group) return;
+
+    /* PERF_FORMAT_GROUP layout: the number of counters, then their values */
+    unsigned long long buf[1 + MAX_EVENTS];
+    ssize_t len = read(pg->leader_fd, buf, sizeof(buf));
+    unsigned long long nr = len >= (ssize_t)sizeof(buf[0]) ? buf[0] : 0;
+
+    for (int i = 0; i < n; i++) {
+        if (pg->fds[i] < 0) continue;
+        now[i] = (unsigned long long)pg->group_idx[i] < nr ? (long long)buf[1 + pg->group_idx[i]] : 0;
+    }
+}
+
+/* Apply a PERF_EVENT_IOC_* request to every perf_event counter of an event
+   set at once through the group leader */
+static void group_ioctl(int slot, unsigned long request) {
+    if (es_perf[slot].leader_fd >= 0)
+        ioctl(es_perf[slot].leader_fd, request, PERF_IOC_FLAG_GROUP);
+}
+
+/* Rebase event i after its group has been reset. perf_event counters were
+   zeroed by the kernel, free-running ones such as the TSC are sampled */
+static void reset_event(int slot, int i) {
+    if (es_perf[slot].fds[i] >= 0) {
+        es_start[slot][i] = 0;
+    } else {
+        read_fn_t fn = es_begin_fn[slot][i];
+        es_start[slot][i] = fn == get_cycles_begin ? get_cycles_begin() : fn();
+    }
+}
+
+/* A forked child keeps cached_pid from its parent, so refresh it there */
+static void refresh_cached_pid(void) {
+    cached_pid = getpid();
+}
+
+static pthread_once_t atfork_once = PTHREAD_ONCE_INIT;
+
+static void register_atfork(void) {
+    pthread_atfork(NULL, NULL, refresh_cached_pid);
+}
+
+/* PAPI function implementations */
+int PAPI_library_init(int version) {
+    if (papi_initialized) return PAPI_VER_CURRENT;
+    papi_initialized = 1;
+    cached_pid = getpid();
+    pthread_once(&atfork_once, register_atfork);
+    /* Try the counter PAPI_TOT_INS uses rather than judging from
+       perf_event_paranoid: root and CAP_PERFMON may open it at any level,
+       and a machine without a PMU refuses it at every level */
+    perf_available = -1;
+    int fd = open_perf_counter(PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS,
+                               -1, PERF_FORMAT_GROUP);
+    perf_available = fd >= 0;
+    perf_errno = fd >= 0 ? 0 : errno;
+    if (fd >= 0) close(fd);
+    
+    /* Initialize event sets */
+    memset(es_num_events, 0, sizeof(es_num_events));
+    memset(es_running, 0, sizeof(es_running));
+    es_free = ES_ALL_FREE;
+    
+    return PAPI_VER_CURRENT;
+}
+
+void PAPI_shutdown(void) {
+    for (int i = 1; i < MAX_EVENT_SETS; i++) {
+        if (!(es_free & (1u << i))) close_perf_counters(i);
+    }
+    /* Release PAPI_ipc state: this thread's now, other threads' when they
+       next call it */
+    rate_states_release(rate_states);
+    __atomic_fetch_add(&rate_generation, 1, __ATOMIC_RELAXED);
+    papi_initialized = 0;
+}
+
+int PAPI_is_initialized(void) {
+    return papi_initialized;
+}
+
+int PAPI_create_eventset(int *EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    
+    /* Take the lowest free slot. cffi releases the GIL around this call,
+       so claim it atomically in case another thread is doing the same */
+    unsigned int free_sets = __atomic_load_n(&es_free, __ATOMIC_RELAXED);
+    int slot;
+    do {
+        if (free_sets == 0) return PAPI_ENOMEM;
+        slot = __builtin_ctz(free_sets);
+    } while (!__atomic_compare_exchange_n(&es_free, &free_sets, free_sets & ~(1u << slot), 0,
+                                          __ATOMIC_ACQ_REL, __ATOMIC_RELAXED));
+    
+    es_num_events[slot] = 0;
+    es_running[slot] = 0;
+    es_perf[slot].leader_fd = -1;
+    es_perf[slot].group_size = 0;
+    *EventSet = slot;
+    return PAPI_OK;
+}
+
+int PAPI_add_event(int EventSet, int Event) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    
+    int num = es_num_events[EventSet];
+    if (num >= MAX_EVENTS) return PAPI_ECNFLCT;
+    
+    es_events[EventSet][num] = Event;
+    resolve_event(EventSet, num);
+    open_event_counter(EventSet, num);
+    es_num_events[EventSet]++;
+    
+    return PAPI_OK;
+}
+
+int PAPI_add_events(int EventSet, int *Events, int number) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    if (number < 0) return PAPI_EINVAL;
+    
+    /* Check the whole group up front so either all events are added or none */
+    int num = es_num_events[EventSet];
+    if (num + number > MAX_EVENTS) return PAPI_ECNFLCT;
+    
+    memcpy(&es_events[EventSet][num], Events, number * sizeof(int));
+    for (int i = num; i < num + number; i++) {
+        resolve_event(EventSet, i);
+        open_event_counter(EventSet, i);
+    }
+    es_num_events[EventSet] += number;
+    
+    return PAPI_OK;
+}
+
+int PAPI_remove_event(int EventSet, int EventCode) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    if (es_running[EventSet]) return PAPI_EISRUN;
+    
+    int num = es_num_events[EventSet];
+    int i = 0;
+    while (i < num && es_events[EventSet][i] != EventCode) i++;
+    if (i == num) return PAPI_EINVAL;
+    
+    /* A perf_event group cannot drop a member, so close the counters and
+       reopen them for the events that remain */
+    close_perf_counters(EventSet);
+    memmove(&es_events[EventSet][i], &es_events[EventSet][i + 1], (num - i - 1) * sizeof(int));
+    memmove(&es_begin_fn[EventSet][i], &es_begin_fn[EventSet][i + 1], (num - i - 1) * sizeof(read_fn_t));
+    memmove(&es_read_fn[EventSet][i], &es_read_fn[EventSet][i + 1], (num - i - 1) * sizeof(read_fn_t));
+    es_num_events[EventSet] = num - 1;
+    for (int j = 0; j < num - 1; j++) {
+        open_event_counter(EventSet, j);
+    }
+    
+    return PAPI_OK;
+}
+
+int PAPI_remove_events(int EventSet, int *Events, int number) {
+    if (number < 0) return PAPI_EINVAL;
+    
+    for (int i = 0; i < number; i++) {
+        int ret = PAPI_remove_event(EventSet, Events[i]);
+        if (ret != PAPI_OK) return ret;
+    }
+    return PAPI_OK;
+}
+
+int PAPI_start(int EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    
+    es_running[EventSet] = 1;
+    
+    /* Record start values for each event */
+    group_ioctl(EventSet, PERF_EVENT_IOC_RESET);
+    for (int i = 0; i < es_num_events[EventSet]; i++) {
+        reset_event(EventSet, i);
+    }
+    group_ioctl(EventSet, PERF_EVENT_IOC_ENABLE);
+    
+    return PAPI_OK;
+}
+
+__attribute__((hot)) int PAPI_read(int EventSet, long long *values) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    if (!es_running[EventSet]) return PAPI_ENOTRUN;
+    
+    /* Read current values for each event */
+    long long now[MAX_EVENTS];
+    const long long *start = es_start[EventSet];
+    read_events(EventSet, now);
+    for (int i = 0; i < es_num_events[EventSet]; i++) {
+        values[i] = now[i] - start[i];
+    }
+    
+    return PAPI_OK;
+}
+
+int PAPI_stop(int EventSet, long long *values) {
+    int ret = PAPI_read(EventSet, values);
+    if (ret != PAPI_OK) return ret;
+    
+    group_ioctl(EventSet, PERF_EVENT_IOC_DISABLE);
+    es_running[EventSet] = 0;
+    return PAPI_OK;
+}
+
+int PAPI_reset(int EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    
+    /* Update start values to current */
+    group_ioctl(EventSet, PERF_EVENT_IOC_RESET);
+    for (int i = 0; i < es_num_events[EventSet]; i++) {
+        reset_event(EventSet, i);
+    }
+    
+    return PAPI_OK;
+}
+
+int PAPI_cleanup_eventset(int EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    if (es_running[EventSet]) return PAPI_EISRUN;
+    
+    close_perf_counters(EventSet);
+    es_num_events[EventSet] = 0;
+    return PAPI_OK;
+}
+
+int PAPI_destroy_eventset(int *EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (*EventSet <= 0 || *EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << *EventSet)) return PAPI_EINVAL;
+    if (es_running[*EventSet]) return PAPI_EISRUN;
+    
+    close_perf_counters(*EventSet);
+    es_num_events[*EventSet] = 0;
+    __atomic_fetch_or(&es_free, 1u << *EventSet, __ATOMIC_RELEASE);
+    *EventSet = PAPI_NULL;
+    return PAPI_OK;
+}
+
+int PAPI_num_events(int EventSet) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    
+    return es_num_events[EventSet];
+}
+
+int PAPI_list_events(int EventSet, int *Events, int *number) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    if (*number < 0) return PAPI_EINVAL;
+    
+    /* Copy what fits and report how many events the set holds */
+    int n = es_num_events[EventSet];
+    memcpy(Events, es_events[EventSet], (n < *number ? n : *number) * sizeof(int));
+    *number = n;
+    return PAPI_OK;
+}
+
+int PAPI_state(int EventSet, int *status) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
+    if (es_free & (1u << EventSet)) return PAPI_EINVAL;
+    
+    *status = es_running[EventSet] ? PAPI_RUNNING : PAPI_STOPPED;
+    return PAPI_OK;
+}
+
+/* Preset events this implementation counts, in event code order */
+static const struct {
+    int code;
+    const char *name;
+    const char *short_descr;
+    const char *long_descr;
+} PRESETS[] = {
+    { PAPI_TOT_INS, "PAPI_TOT_INS", "Instr completed", "Instructions completed" },
+    { PAPI_TOT_CYC, "PAPI_TOT_CYC", "Total cycles", "Total cycles" },
+};
+#define NUM_PRESETS ((int)(sizeof(PRESETS) / sizeof(PRESETS[0])))
+
+int PAPI_enum_event(int *EventCode, int modifier) {
+    (void)modifier;
+    if (!papi_initialized) return PAPI_ENOINIT;
+    
+    /* The first preset with a larger code follows *EventCode */
+    for (int i = 0; i < NUM_PRESETS; i++) {
+        if ((unsigned int)PRESETS[i].code > (unsigned int)*EventCode) {
+            *EventCode = PRESETS[i].code;
+            return PAPI_OK;
+        }
+    }
+    return PAPI_ENOEVNT;
+}
+
+int PAPI_event_code_to_name(int EventCode, char *out) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    
+    for (int i = 0; i < NUM_PRESETS; i++) {
+        if (PRESETS[i].code == EventCode) {
+            strcpy(out, PRESETS[i].name);
+            return PAPI_OK;
+        }
+    }
+    return PAPI_ENOEVNT;
+}
+
+int PAPI_get_event_info(int EventCode, PAPI_event_info_t *info) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    
+    for (int i = 0; i < NUM_PRESETS; i++) {
+        if (PRESETS[i].code == EventCode) {
+            memset(info, 0, sizeof(*info));
+            info->event_code = (unsigned int)EventCode;
+            strcpy(info->symbol, PRESETS[i].name);
+            strcpy(info->short_descr, PRESETS[i].short_descr);
+            strcpy(info->long_descr, PRESETS[i].long_descr);
+            strcpy(info->derived, "NOT_DERIVED");
+            return PAPI_OK;
+        }
+    }
+    return PAPI_ENOEVNT;
+}
+
+int PAPI_event_name_to_code(const char *in, int *out) {
+    if (!papi_initialized) return PAPI_ENOINIT;
+    
+    for (int i = 0; i < NUM_PRESETS; i++) {
+        if (strcmp(PRESETS[i].name, in) == 0) {
+            *out = PRESETS[i].code;
+            return PAPI_OK;
+        }
+    }
+    return PAPI_ENOEVNT;
+}
+
+int PAPI_add_named_event(int EventSet, const char *EventName) {
+    int code;
+    int ret = PAPI_event_name_to_code(EventName, &code);
+    if (ret != PAPI_OK) return ret;
+    
+    return PAPI_add_event(EventSet, code);
+}
+
+int PAPI_remove_named_event(int EventSet, const char *EventName) {
+    int code;
+    int ret = PAPI_event_name_to_code(EventName, &code);
+    if (ret != PAPI_OK) return ret;
+    
+    return PAPI_remove_event(EventSet, code);
+}
+
+int PAPI_num_components(void) {
+    return 1; /* Only the "cpu" component */
+}
+
+/* Messages indexed by -errorCode. Codes without an entry are reported as
+   unknown */
+static const char *const ERR_STRINGS[] = {
+    [-PAPI_OK] = "No error",
+    [-PAPI_EINVAL] = "Invalid argument",
+    [-PAPI_ENOMEM] = "Insufficient memory",
+    [-PAPI_ESYS] = "A System/C library call failed",
+    [-PAPI_ECMP] = "Not supported by component",
+    [-PAPI_ENOINIT] = "PAPI hasn't been initialized yet",
+    [-PAPI_ENOEVNT] = "Event does not exist",
+    [-PAPI_ECNFLCT] = "Event cannot be counted due to counter resource limitations",
+    [-PAPI_ENOTRUN] = "EventSet is not started",
+    [-PAPI_EISRUN] = "EventSet is currently running",
+};
+
+char *PAPI_strerror(int errorCode) {
+    /* Per thread, so concurrent callers do not overwrite each other */
+    static __thread char error_str[PAPI_MAX_STR_LEN];
+    
+    unsigned int idx = -(unsigned int)errorCode;
+    if (idx < sizeof(ERR_STRINGS) / sizeof(ERR_STRINGS[0]) && ERR_STRINGS[idx])
+        return (char *)ERR_STRINGS[idx];
+    
+    snprintf(error_str, PAPI_MAX_STR_LEN, "Unknown error code: %d", errorCode);
+    return error_str;
+}
+
+__attribute__((hot)) long long PAPI_get_real_cyc(void) {
+    return get_cycles();
+}
+
+long long PAPI_get_real_usec(void) {
+    return get_usec();
+}
+
+__attribute__((hot)) long long PAPI_get_real_nsec(void) {
+    struct timespec ts;
+    clock_gettime(REAL_CLOCK, &ts);
+    return (long long)ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+/* Virtual time is CPU time consumed by the calling thread */
+long long PAPI_get_virt_nsec(void) {
+    struct timespec ts;
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    return ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+long long PAPI_get_virt_usec(void) {
+    return PAPI_get_virt_nsec() / 1000;
+}
+
+/* CPU time scaled by the nominal clock. Without a known clock, count
+   nanoseconds as the cycle fallback does */
+long long PAPI_get_virt_cyc(void) {
+    int mhz = PAPI_get_hardware_info()->cpu_max_mhz;
+    if (mhz <= 0) return PAPI_get_virt_nsec();
+    return PAPI_get_virt_usec() * mhz;
+}
+
+const PAPI_component_info_t *PAPI_get_component_info(int cidx) {
+    static PAPI_component_info_t info;
+    
+    if (cidx != 0) return NULL; /* Only support the "cpu" component */
+    
+    if (!info.name[0]) {
+        strcpy(info.name, "cpu");
+        strcpy(info.short_name, "cpu");
+        strcpy(info.description, "System CPU metrics");
+        strcpy(info.version, "1.0");
+        info.num_cntrs = MAX_EVENTS;
+        info.num_preset_events = 2; /* TOT_CYC and TOT_INS */
+    }
+    if (!perf_available) {
+        info.disabled = perf_errno == EACCES || perf_errno == EPERM ? PAPI_EPERM
+                                                                     : PAPI_ENOSUPP;
+        snprintf(info.disabled_reason, sizeof(info.disabled_reason),
+                 "perf_event_open: %s, PAPI_TOT_INS is estimated from CPU time",
+                 strerror(perf_errno));
+    } else {
+        info.disabled = 0;
+        info.disabled_reason[0] = '\0';
+    }
+    
+    return &info;
+}
+
+/* Copy the value of a "key : value" line from /proc/cpuinfo into out,
+   without the trailing newline. Returns 0 if the line is for another key */
+static int cpuinfo_value(const char *line, const char *key, char *out, size_t len) {
+    size_t n = strlen(key);
+    
+    if (strncmp(line, key, n) != 0) return 0;
+    const char *v = line + n + strspn(line + n, " \t");
+    if (*v != ':') return 0;
+    v++;
+    while (*v == ' ') v++;
+    snprintf(out, len, "%.*s", (int)strcspn(v, "\n"), v);
+    return 1;
+}
+
+/* Read a single integer from a sysfs or procfs file, or return def */
+static long read_long_file(const char *path, long def) {
+    FILE *fp = fopen(path, "r");
+    long value = def;
+    
+    if (fp) {
+        if (fscanf(fp, "%ld", &value) != 1) value = def;
+        fclose(fp);
+    }
+    return value;
+}
+
+const PAPI_hw_info_t *PAPI_get_hardware_info(void) {
+    static PAPI_hw_info_t info;
+    static int filled = 0;
+    
+    if (filled) return &info;
+    
+    char line[1024], value[PAPI_MAX_STR_LEN];
+    int siblings = 0, max_socket = -1;
+    float mhz = 0;
+    FILE *fp = fopen("/proc/cpuinfo", "r");
+    
+    if (fp) {
+        /* Every processor repeats the same fields; the first one wins */
+        while (fgets(line, sizeof(line), fp)) {
+            if (cpuinfo_value(line, "vendor_id", value, sizeof(value)) && !info.vendor_string[0])
+                strcpy(info.vendor_string, value);
+            else if (cpuinfo_value(line, "model name", value, sizeof(value)) && !info.model_string[0])
+                strcpy(info.model_string, value);
+            else if (cpuinfo_value(line, "cpu family", value, sizeof(value)) && !info.cpuid_family)
+                info.cpuid_family = atoi(value);
+            else if (cpuinfo_value(line, "model", value, sizeof(value)) && !info.cpuid_model)
+                info.cpuid_model = atoi(value);
+            else if (cpuinfo_value(line, "stepping", value, sizeof(value)) && !info.cpuid_stepping)
+                info.cpuid_stepping = atoi(value);
+            else if (cpuinfo_value(line, "cpu MHz", value, sizeof(value)) && mhz == 0)
+                mhz = atof(value);
+            else if (cpuinfo_value(line, "siblings", value, sizeof(value)) && !siblings)
+                siblings = atoi(value);
+            else if (cpuinfo_value(line, "cpu cores", value, sizeof(value)) && !info.cores)
+                info.cores = atoi(value);
+            else if (cpuinfo_value(line, "physical id", value, sizeof(value)) && atoi(value) > max_socket)
+                max_socket = atoi(value);
+        }
+        fclose(fp);
+    }
+    
+    info.totalcpus = (int)sysconf(_SC_NPROCESSORS_CONF);
+    info.ncpu = (int)sysconf(_SC_NPROCESSORS_ONLN);
+    info.nnodes = 1;
+    if (info.cores <= 0) info.cores = info.ncpu;
+    info.threads = siblings > 0 ? siblings / info.cores : 1;
+    info.sockets = max_socket >= 0 ? max_socket + 1 : 1;
+    info.model = info.cpuid_model;
+    info.revision = (float)info.cpuid_stepping;
+    
+    /* cpufreq reports kHz; fall back to the current clock from cpuinfo */
+    info.cpu_max_mhz = (int)(read_long_file("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq", 0) / 1000);
+    info.cpu_min_mhz = (int)(read_long_file("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_min_freq", 0) / 1000);
+    if (info.cpu_max_mhz <= 0) info.cpu_max_mhz = (int)mhz;
+    if (info.cpu_min_mhz <= 0) info.cpu_min_mhz = info.cpu_max_mhz;
+    
+    filled = 1;
+    return &info;
+}
+
+/* Address ranges come from the executable's mappings in /proc/self/maps:
+   text is its executable mapping, data its writable one and bss the
+   anonymous mapping that directly follows the data */
+const PAPI_exe_info_t *PAPI_get_executable_info(void) {
+    static PAPI_exe_info_t info;
+    static int filled = 0;
+    
+    if (filled) return &info;
+    
+    ssize_t len = readlink("/proc/self/exe", info.fullname, sizeof(info.fullname) - 1);
+    if (len < 0) return NULL;
+    info.fullname[len] = '\0';
+    const char *base = strrchr(info.fullname, '/');
+    snprintf(info.address_info.name, sizeof(info.address_info.name), "%s",
+             base ? base + 1 : info.fullname);
+    
+    FILE *fp = fopen("/proc/self/maps", "r");
+    if (fp) {
+        char line[PAPI_HUGE_STR_LEN + 128], perms[8], path[PAPI_HUGE_STR_LEN];
+        unsigned long start, end;
+        
+        while (fgets(line, sizeof(line), fp)) {
+            path[0] = '\0';
+            if (sscanf(line, "%lx-%lx %7s %*s %*s %*s %1023[^\n]", &start, &end, perms, path) < 3)
+                continue;
+            if (strcmp(path, info.fullname) == 0) {
+                if (perms[2] == 'x' && !info.address_info.text_start) {
+                    info.address_info.text_start = (caddr_t)start;
+                    info.address_info.text_end = (caddr_t)end;
+                } else if (perms[1] == 'w') {
+                    info.address_info.data_start = (caddr_t)start;
+                    info.address_info.data_end = (caddr_t)end;
+                }
+            } else if (!path[0] && info.address_info.data_end == (caddr_t)start && start) {
+                info.address_info.bss_start = (caddr_t)start;
+                info.address_info.bss_end = (caddr_t)end;
+            }
+        }
+        fclose(fp);
+    }
+    
+    filled = 1;
+    return &info;
+}
+
+/* Sizes in kB from /proc/self/status, as PAPI reports them */
+int PAPI_get_dmem_info(PAPI_dmem_info_t *dest) {
+    static const struct {
+        const char *key;
+        size_t offset;
+    } FIELDS[] = {
+        { "VmPeak:", offsetof(PAPI_dmem_info_t, peak) },
+        { "VmSize:", offsetof(PAPI_dmem_info_t, size) },
+        { "VmRSS:", offsetof(PAPI_dmem_info_t, resident) },
+        { "VmHWM:", offsetof(PAPI_dmem_info_t, high_water_mark) },
+        { "RssShmem:", offsetof(PAPI_dmem_info_t, shared) },
+        { "VmExe:", offsetof(PAPI_dmem_info_t, text) },
+        { "VmLib:", offsetof(PAPI_dmem_info_t, library) },
+        { "VmData:", offsetof(PAPI_dmem_info_t, heap) },
+        { "VmLck:", offsetof(PAPI_dmem_info_t, locked) },
+        { "VmStk:", offsetof(PAPI_dmem_info_t, stack) },
+        { "VmPTE:", offsetof(PAPI_dmem_info_t, pte) },
+    };
+    char line[256];
+    FILE *fp = fopen("/proc/self/status", "r");
+    
+    if (!fp) return PAPI_ESYS;
+    memset(dest, 0, sizeof(*dest));
+    while (fgets(line, sizeof(line), fp)) {
+        for (size_t i = 0; i < sizeof(FIELDS) / sizeof(FIELDS[0]); i++) {
+            size_t n = strlen(FIELDS[i].key);
+            if (strncmp(line, FIELDS[i].key, n) == 0) {
+                *(long long *)((char *)dest + FIELDS[i].offset) = atoll(line + n);
+                break;
+            }
+        }
+    }
+    fclose(fp);
+    dest->pagesize = sysconf(_SC_PAGESIZE);
+    return PAPI_OK;
+}
+
+static long long rate_event_count(RateState *rs) {
+    if (rs->fd >= 0) return read_perf_counter(rs->fd, NULL);
+    return rs->event == PAPI_TOT_CYC ? get_cycles() : get_instructions();
+}
+
+/* Measure event (PAPI_TOT_INS or PAPI_TOT_CYC) and cycles over the interval
+   since the previous call on rs. The first call, and the first after
+   PAPI_shutdown or a change of event, only records the baseline, reports
+   zeros and returns 0 */
+static int rate_interval(RateState *rs, int event, float *rtime, float *ptime,
+                         long long *evt, long long *cycles) {
+    struct timespec ts;
+    struct rusage ru;
+    long long cyc, count;
+    unsigned int generation = __atomic_load_n(&rate_generation, __ATOMIC_RELAXED);
+    
+    if (rs->valid && (rs->generation != generation || rs->event != event))
+        rate_state_release(rs);
+    if (!rs->valid) {
+        /* Registering the state makes its fd close when the thread exits */
+        pthread_once(&rate_key_once, rate_key_create);
+        pthread_setspecific(rate_key, rate_states);
+        rs->event = event;
+        if (event == PAPI_TOT_INS) {
+            rs->fd = open_perf_counter(PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS, -1, 0);
+            if (rs->fd >= 0) ioctl(rs->fd, PERF_EVENT_IOC_ENABLE, 0);
+        }
+        rs->generation = generation;
+        
+        clock_gettime(REAL_CLOCK, &rs->base_ts);
+        getrusage(RUSAGE_SELF, &rs->base_ru);
+        rs->base_evt = rate_event_count(rs);
+        rs->base_cyc = get_cycles_begin();
+        rs->valid = 1;
+        
+        *rtime = 0.0;
+        *ptime = 0.0;
+        *evt = 0;
+        *cycles = 0;
+        return 0;
+    }
+    
+    cyc = get_cycles();
+    count = rate_event_count(rs);
+    clock_gettime(REAL_CLOCK, &ts);
+    getrusage(RUSAGE_SELF, &ru);
+    
+    /* Calculate real time */
+    *rtime = (ts.tv_sec - rs->base_ts.tv_sec) + 
+             (ts.tv_nsec - rs->base_ts.tv_nsec) / 1.0e9;
+    
+    /* Calculate process time */
+    *ptime = ((ru.ru_utime.tv_sec - rs->base_ru.ru_utime.tv_sec) + 
+             (ru.ru_utime.tv_usec - rs->base_ru.ru_utime.tv_usec) / 1.0e6) +
+            ((ru.ru_stime.tv_sec - rs->base_ru.ru_stime.tv_sec) + 
+             (ru.ru_stime.tv_usec - rs->base_ru.ru_stime.tv_usec) / 1.0e6);
+    
+    *evt = count - rs->base_evt;
+    *cycles = cyc - rs->base_cyc;
+    
+    /* The next call measures from here */
+    rs->base_cyc = cyc;
+    rs->base_evt = count;
+    rs->base_ts = ts;
+    rs->base_ru = ru;
+    
+    return 1;
+}
+
+int PAPI_ipc(float *rtime, float *ptime, long long *ins, float *ipc) {
+    long long cycles;
+    
+    rate_interval(&rate_states[RATE_IPC], PAPI_TOT_INS, rtime, ptime, ins, &cycles);
+    *ipc = (cycles > 0) ? ((float)*ins / cycles) : 0.0;
+    return PAPI_OK;
+}
+
+/* Event 0 counts instructions. Reference and core cycles both come from
+   the cycle counter */
+int PAPI_epc(int event, float *rtime, float *ptime, long long *ref, long long *core,
+             long long *evt, float *epc) {
+    long long cycles;
+    
+    if (event == 0) event = PAPI_TOT_INS;
+    if (event != PAPI_TOT_INS && event != PAPI_TOT_CYC) return PAPI_ENOEVNT;
+    
+    rate_interval(&rate_states[RATE_EPC], event, rtime, ptime, evt, &cycles);
+    *ref = cycles;
+    *core = cycles;
+    *epc = (cycles > 0) ? ((float)*evt / cycles) : 0.0;
+    return PAPI_OK;
+}
+
+/* There is no floating point counter to base these on */
+int PAPI_flips_rate(int event, float *rtime, float *ptime, long long *flpins, float *mflips) {
+    (void)event; (void)rtime; (void)ptime; (void)flpins; (void)mflips;
+    return PAPI_ENOEVNT;
+}
+
+int PAPI_flops_rate(int event, float *rtime, float *ptime, long long *flpops, float *mflops) {
+    (void)event; (void)rtime; (void)ptime; (void)flpops; (void)mflops;
+    return PAPI_ENOEVNT;
+}
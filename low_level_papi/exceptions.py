@@ -1,5 +1,5 @@
 """
-Exception handling for the low_level_pipa module.
+Exception handling for the low_level_papi module.
 """
 import functools
 from ._papi import lib, ffi
@@ -8,9 +8,17 @@ class PapiError(Exception):
     """Base class for all PAPI errors."""
     def __init__(self, code=None, message=None):
         self.code = code
-        if message is None and code is not None:
-            message = ffi.string(lib.PAPI_strerror(code)).decode("utf-8")
-        super().__init__(message)
+        # Looked up from PAPI_strerror only when the error is printed, so
+        # code that catches and ignores errors does not pay for it
+        self._msg = message
+        super().__init__(code, message)
+
+    def __str__(self):
+        if self._msg is None:
+            if self.code is None:
+                return ""
+            self._msg = ffi.string(lib.PAPI_strerror(self.code)).decode("ascii")
+        return self._msg
 
 class PapiInvalidValueError(PapiError):
     """Raised when a PAPI function is passed an invalid value."""
@@ -143,8 +151,28 @@ ERROR_MAP = {
     lib.PAPI_ECOUNT: PapiCountError,
     lib.PAPI_ECOMBO: PapiComboError,
     lib.PAPI_ECMP_DISABLED: PapiComponentDisabledError,
-    lib.PAPI_EDELAY_INIT: PapiDelayInitError,
 }
+# PAPI_EDELAY_INIT is newer than PAPI 6.0, so papi_public.h cannot declare
+# it for every papi.h; its value is fixed by PAPI
+ERROR_MAP[-26] = PapiDelayInitError
+
+# The same mapping as a tuple indexed by -rcode, so that raising does an
+# index instead of a dict lookup
+_MAX_ERROR = max(-code for code in ERROR_MAP)
+_ERRS = [PapiError] * (_MAX_ERROR + 1)
+for _code, _cls in ERROR_MAP.items():
+    _ERRS[-_code] = _cls
+_ERRS = tuple(_ERRS)
+del _code, _cls
+
+def _raise(rcode):
+    """Raise the exception matching a negative PAPI return code.
+
+    Kept as a separate function so that callers checking return codes
+    inline only carry a call on their rarely taken error branch.
+    """
+    idx = -rcode
+    raise (_ERRS[idx] if idx <= _MAX_ERROR else PapiError)(rcode)
 
 def papi_error(func):
     """Decorator to check PAPI return codes and raise appropriate exceptions."""
@@ -152,18 +180,13 @@ def papi_error(func):
     def wrapper(*args, **kwargs):
         ret = func(*args, **kwargs)
         
-        if isinstance(ret, tuple):
+        if ret.__class__ is tuple:
             rcode, result = ret
         else:
             rcode, result = ret, None
             
-        if rcode < 0:
-            error_class = ERROR_MAP.get(rcode, PapiError)
-            raise error_class(rcode)
-        
-        if result is not None:
-            return result
-        else:
-            return rcode
+        if rcode >= 0:
+            return rcode if result is None else result
+        _raise(rcode)
             
     return wrapper
@@ -1,390 +1,194 @@
 """
 CFFI build script for the low_level_papi module.
-This version implements a standalone version that doesn't require an external PAPI installation.
+By default the bundled C implementation in embedded_papi/ is built into the
+extension, so no external PAPI installation is needed. Set
+LOW_LEVEL_PAPI_EMBEDDED=0 to link against an installed libpapi instead,
+found under PAPI_DIR if it is set.
 """
 import os
-import sys
+import subprocess
+import sysconfig
+import tempfile
 from cffi import FFI
 
 _ROOT = os.path.abspath(os.path.dirname(__file__))
-_PAPI_H = os.path.join(_ROOT, "papi.h")
+# Only the public part of the PAPI header is passed to cdef; the C sources
+# include the full papi.h
+_PAPI_H = os.path.join(_ROOT, "papi_public.h")
+# Standalone C implementation of the PAPI calls, built into the extension
 _EMBEDDED_PAPI_DIR = os.path.join(_ROOT, "embedded_papi")
+USE_EMBEDDED = os.environ.get("LOW_LEVEL_PAPI_EMBEDDED", "1") == "1"
+
+# Helpers called from Python that fold several PAPI calls into one.
+# _papi_dump_consts() lets consts.py fetch every exported PAPI_* constant
+# with a single call; the order of its values must match consts._NAMES.
+_HELPERS_SOURCE = """
+static int _papi_dump_consts(long long *out, int n) {
+    static const long long values[] = {
+        PAPI_VER_CURRENT,
+        /* Event codes are C ints, so the preset mask is exported as the
+           negative int PAPI uses rather than 0x80000000 */
+        (int)PAPI_PRESET_MASK, PAPI_NATIVE_MASK,
+        PAPI_MAX_STR_LEN, PAPI_MIN_STR_LEN, PAPI_2MAX_STR_LEN, PAPI_HUGE_STR_LEN,
+        PAPI_MAX_MPX_CTRS,
+        PAPI_NULL,
+        PAPI_DOM_USER, PAPI_DOM_KERNEL, PAPI_DOM_OTHER, PAPI_DOM_SUPERVISOR,
+        PAPI_DOM_HWSPEC,
+        PAPI_GRN_THR, PAPI_GRN_PROC, PAPI_GRN_PROCG, PAPI_GRN_SYS, PAPI_GRN_SYS_CPU,
+        PAPI_QUIET, PAPI_VERB_ECONT, PAPI_VERB_ESTOP,
+        PAPI_STOPPED, PAPI_RUNNING, PAPI_PAUSED, PAPI_NOT_INIT, PAPI_OVERFLOWING,
+        PAPI_PROFILING, PAPI_MULTIPLEXING, PAPI_ATTACHED, PAPI_CPU_ATTACHED,
+        PAPI_USR1_LOCK, PAPI_USR2_LOCK, PAPI_NUM_LOCK,
+        PAPI_FP_INS, PAPI_FP_OPS, PAPI_VEC_SP, PAPI_VEC_DP,
+    };
+    int count = (int)(sizeof(values) / sizeof(values[0]));
+
+    if (n > count) n = count;
+    memcpy(out, values, n * sizeof(values[0]));
+    return count;
+}
+
+/* Read or stop an event set into a buffer of max values and return the
+   number of values written, so Python needs no PAPI_num_events call */
+static int _papi_read_n(int EventSet, long long *values, int max) {
+    int n = PAPI_num_events(EventSet);
+    if (n < 0) return n;
+    if (n > max) return PAPI_EBUF;
 
-# Create the embedded_papi directory if it doesn't exist
-if not os.path.exists(_EMBEDDED_PAPI_DIR):
-    os.makedirs(_EMBEDDED_PAPI_DIR)
-
-# Create a system-based implementation of PAPI functions that doesn't rely on mock values
-with open(os.path.join(_EMBEDDED_PAPI_DIR, "papi_impl.c"), "w") as f:
-    f.write("""
-#define _GNU_SOURCE
-#include <stdlib.h>
-#include <time.h>
-#include <string.h>
-#include <stdio.h>
-#include <unistd.h>
-#include <sys/time.h>
-#include <sys/resource.h>
-#include <sys/types.h>
-#include <fcntl.h>
-#include <errno.h>
-#include "papi.h"
-
-/* Global state */
-static int papi_initialized = 0;
-static int last_event_set = 0;
-
-/* Event set data structure */
-#define MAX_EVENTS 10
-typedef struct {
-    int id;
-    int num_events;
-    int events[MAX_EVENTS];
-    long long start_values[MAX_EVENTS];
-    int running;
-} EventSet;
-
-#define MAX_EVENT_SETS 32
-static EventSet event_sets[MAX_EVENT_SETS];
-
-/* Perf-related constants */
-#define TSC_CYCLES 0
-#define INSTRUCTIONS 1
-
-/* Utility functions */
-static unsigned long long rdtsc() {
-    unsigned int lo, hi;
-    __asm__ __volatile__ ("rdtsc" : "=a" (lo), "=d" (hi));
-    return ((unsigned long long)hi << 32) | lo;
-}
-
-static long long get_cycles() {
-    #ifdef __x86_64__
-    return (long long)rdtsc();
-    #else
-    struct timespec ts;
-    clock_gettime(CLOCK_MONOTONIC, &ts);
-    return (ts.tv_sec * 1000000000LL + ts.tv_nsec) / 10; 
-    #endif
-}
-
-static long long get_usec() {
-    struct timespec ts;
-    clock_gettime(CLOCK_MONOTONIC, &ts);
-    return ts.tv_sec * 1000000LL + ts.tv_nsec / 1000;
-}
-
-/* Get accurate CPU instructions using Linux perf if available */
-static long long get_instructions() {
-    long long result = 0;
-    FILE *fp;
-    char filename[256];
-    char line[1024];
-    pid_t pid = getpid();
-    
-    /* Try to get instructions from kernel counters */
-    snprintf(filename, sizeof(filename), "/proc/%d/stat", pid);
-    fp = fopen(filename, "r");
-    if (fp) {
-        if (fgets(line, sizeof(line), fp)) {
-            /* The 15th field is utime, 16th is stime - we'll use those as a base for instructions */
-            char *token;
-            int i = 0;
-            token = strtok(line, " ");
-            while (token && i < 14) {
-                token = strtok(NULL, " ");
-                i++;
-            }
-            if (token) {
-                long utime = atol(token);
-                token = strtok(NULL, " ");
-                if (token) {
-                    long stime = atol(token);
-                    /* Estimate instructions based on CPU time */
-                    result = (utime + stime) * 1000000LL;
-                }
-            }
-        }
-        fclose(fp);
-    }
-    
-    /* If we couldn't get a value, use cycles as an approximation */
-    if (result == 0) {
-        result = get_cycles();
-    }
-    
-    return result;
-}
-
-/* PAPI function implementations */
-int PAPI_library_init(int version) {
-    if (papi_initialized) return PAPI_VER_CURRENT;
-    papi_initialized = 1;
-    
-    /* Initialize event sets */
-    memset(event_sets, 0, sizeof(event_sets));
-    
-    return PAPI_VER_CURRENT;
-}
-
-void PAPI_shutdown(void) {
-    papi_initialized = 0;
-}
-
-int PAPI_is_initialized(void) {
-    return papi_initialized;
-}
-
-int PAPI_create_eventset(int *EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    
-    /* Find an empty event set slot */
-    int i;
-    for (i = 1; i < MAX_EVENT_SETS; i++) {  /* Start from 1 since 0 is invalid */
-        if (event_sets[i].id == 0) {
-            event_sets[i].id = i;
-            event_sets[i].num_events = 0;
-            event_sets[i].running = 0;
-            *EventSet = i;
-            return PAPI_OK;
-        }
-    }
-    
-    return PAPI_ENOMEM;
-}
-
-int PAPI_add_event(int EventSet, int Event) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    
-    int num = event_sets[EventSet].num_events;
-    if (num >= MAX_EVENTS) return PAPI_ECNFLCT;
-    
-    event_sets[EventSet].events[num] = Event;
-    event_sets[EventSet].num_events++;
-    
-    return PAPI_OK;
-}
-
-int PAPI_start(int EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    
-    event_sets[EventSet].running = 1;
-    
-    /* Record start values for each event */
-    for (int i = 0; i < event_sets[EventSet].num_events; i++) {
-        int event = event_sets[EventSet].events[i];
-        
-        if (event == PAPI_TOT_CYC) {
-            event_sets[EventSet].start_values[i] = get_cycles();
-        }
-        else if (event == PAPI_TOT_INS) {
-            event_sets[EventSet].start_values[i] = get_instructions();
-        }
-        else {
-            /* Default to cycles for unknown events */
-            event_sets[EventSet].start_values[i] = get_cycles();
-        }
-    }
-    
-    return PAPI_OK;
-}
-
-int PAPI_read(int EventSet, long long *values) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    if (!event_sets[EventSet].running) return PAPI_ENOTRUN;
-    
-    /* Read current values for each event */
-    for (int i = 0; i < event_sets[EventSet].num_events; i++) {
-        int event = event_sets[EventSet].events[i];
-        long long current;
-        
-        if (event == PAPI_TOT_CYC) {
-            current = get_cycles();
-        }
-        else if (event == PAPI_TOT_INS) {
-            current = get_instructions();
-        }
-        else {
-            /* Default to cycles for unknown events */
-            current = get_cycles();
-        }
-        
-        values[i] = current - event_sets[EventSet].start_values[i];
-    }
-    
-    return PAPI_OK;
-}
-
-int PAPI_stop(int EventSet, long long *values) {
     int ret = PAPI_read(EventSet, values);
-    if (ret != PAPI_OK) return ret;
-    
-    event_sets[EventSet].running = 0;
-    return PAPI_OK;
-}
-
-int PAPI_reset(int EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    
-    /* Update start values to current */
-    for (int i = 0; i < event_sets[EventSet].num_events; i++) {
-        int event = event_sets[EventSet].events[i];
-        
-        if (event == PAPI_TOT_CYC) {
-            event_sets[EventSet].start_values[i] = get_cycles();
-        }
-        else if (event == PAPI_TOT_INS) {
-            event_sets[EventSet].start_values[i] = get_instructions();
-        }
-        else {
-            /* Default to cycles for unknown events */
-            event_sets[EventSet].start_values[i] = get_cycles();
-        }
-    }
-    
-    return PAPI_OK;
+    return ret < 0 ? ret : n;
 }
 
-int PAPI_cleanup_eventset(int EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    if (event_sets[EventSet].running) return PAPI_EISRUN;
-    
-    event_sets[EventSet].num_events = 0;
-    return PAPI_OK;
-}
+static int _papi_stop_n(int EventSet, long long *values, int max) {
+    int n = PAPI_num_events(EventSet);
+    if (n < 0) return n;
+    if (n > max) return PAPI_EBUF;
 
-int PAPI_destroy_eventset(int *EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (*EventSet <= 0 || *EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[*EventSet].id == 0) return PAPI_EINVAL;
-    if (event_sets[*EventSet].running) return PAPI_EISRUN;
-    
-    event_sets[*EventSet].id = 0;
-    *EventSet = PAPI_NULL;
-    return PAPI_OK;
+    int ret = PAPI_stop(EventSet, values);
+    return ret < 0 ? ret : n;
 }
 
-int PAPI_num_events(int EventSet) {
-    if (!papi_initialized) return PAPI_ENOINIT;
-    if (EventSet <= 0 || EventSet >= MAX_EVENT_SETS) return PAPI_EINVAL;
-    if (event_sets[EventSet].id == 0) return PAPI_EINVAL;
-    
-    return event_sets[EventSet].num_events;
-}
+/* Walk PAPI_enum_event from EventCode until it runs out of events, storing
+   up to max codes and the total number found, which may exceed max, in
+   *count. Returns PAPI_OK at the end of the list, or the error that
+   stopped the walk */
+static int _papi_enum_all(int EventCode, int modifier, int *codes, int max,
+                          int *count) {
+    int n = 0, ret;
 
-char *PAPI_strerror(int errorCode) {
-    static char error_str[PAPI_MAX_STR_LEN];
-    
-    switch(errorCode) {
-        case PAPI_OK: return "No error";
-        case PAPI_EINVAL: return "Invalid argument";
-        case PAPI_ENOMEM: return "Insufficient memory";
-        case PAPI_ESYS: return "A System/C library call failed";
-        case PAPI_ECMP: return "Not supported by component";
-        case PAPI_ENOINIT: return "PAPI hasn't been initialized yet";
-        case PAPI_ENOEVNT: return "Event does not exist";
-        case PAPI_ECNFLCT: return "Event cannot be counted due to counter resource limitations";
-        case PAPI_ENOTRUN: return "EventSet is not started";
-        case PAPI_EISRUN: return "EventSet is currently running";
-        default:
-            snprintf(error_str, PAPI_MAX_STR_LEN, "Unknown error code: %d", errorCode);
-            return error_str;
+    while ((ret = PAPI_enum_event(&EventCode, modifier)) == PAPI_OK) {
+        if (n < max) codes[n] = EventCode;
+        n++;
     }
+    *count = n;
+    return ret == PAPI_ENOEVNT ? PAPI_OK : ret;
 }
+"""
 
-long long PAPI_get_real_cyc(void) {
-    return get_cycles();
-}
-
-long long PAPI_get_real_usec(void) {
-    return get_usec();
-}
-
-long long PAPI_get_real_nsec(void) {
-    struct timespec ts;
-    clock_gettime(CLOCK_MONOTONIC, &ts);
-    return ts.tv_sec * 1000000000LL + ts.tv_nsec;
-}
-
-int PAPI_get_component_info(int cidx) {
-    static PAPI_component_info_t info;
-    
-    if (cidx != 0) return (int)NULL; /* Only support the "cpu" component */
-    
-    strcpy(info.name, "cpu");
-    strcpy(info.short_name, "cpu");
-    strcpy(info.description, "System CPU metrics");
-    strcpy(info.version, "1.0");
-    info.num_cntrs = MAX_EVENTS;
-    info.num_preset_events = 2; /* TOT_CYC and TOT_INS */
-    
-    return (int)&info;
-}
-
-int PAPI_ipc(float *rtime, float *ptime, long long *ins, float *ipc) {
-    struct timespec ts_start, ts_end;
-    long long start_cycles, end_cycles;
-    long long start_ins, end_ins;
-    
-    clock_gettime(CLOCK_MONOTONIC, &ts_start);
-    start_cycles = get_cycles();
-    start_ins = get_instructions();
-    
-    /* Get actual CPU usage for current process */
-    struct rusage ru_start, ru_end;
-    getrusage(RUSAGE_SELF, &ru_start);
-    
-    /* Let some time pass to collect measurements */
-    usleep(10000); /* 10ms */
-    
-    end_cycles = get_cycles();
-    end_ins = get_instructions();
-    clock_gettime(CLOCK_MONOTONIC, &ts_end);
-    getrusage(RUSAGE_SELF, &ru_end);
-    
-    /* Calculate real time */
-    *rtime = (ts_end.tv_sec - ts_start.tv_sec) + 
-             (ts_end.tv_nsec - ts_start.tv_nsec) / 1.0e9;
-    
-    /* Calculate process time */
-    *ptime = ((ru_end.ru_utime.tv_sec - ru_start.ru_utime.tv_sec) + 
-             (ru_end.ru_utime.tv_usec - ru_start.ru_utime.tv_usec) / 1.0e6) +
-            ((ru_end.ru_stime.tv_sec - ru_start.ru_stime.tv_sec) + 
-             (ru_end.ru_stime.tv_usec - ru_start.ru_stime.tv_usec) / 1.0e6);
-    
-    /* Calculate instructions */
-    *ins = end_ins - start_ins;
-    
-    /* Calculate IPC */
-    long long cycles = end_cycles - start_cycles;
-    *ipc = (cycles > 0) ? ((float)*ins / cycles) : 0.0;
-    
-    return PAPI_OK;
-}
-    """)
+# Bitfields of PAPI_component_info_t, in the bit order in which
+# _papi_component_flags() packs them. The extension exports the names as
+# _papi_component_flag_names, so core.py reads them from there.
+# They are read in C because cffi cannot declare bitfields in the partial
+# structs of papi_public.h.
+_COMPONENT_FLAGS = (
+    "hardware_intr", "precise_intr", "posix1b_timers", "kernel_profile",
+    "kernel_multiplex", "data_address_range", "instr_address_range",
+    "fast_counter_read", "fast_real_timer", "fast_virtual_timer", "attach",
+    "attach_must_ptrace", "edge_detect", "invert", "read_reset", "inherit",
+    "cpu", "cntr_umasks",
+)
+# Flags that PAPI 6 comments out of its PAPI_component_info_t; they read as
+# unset with an installed libpapi
+_SYSTEM_MISSING_FLAGS = frozenset((
+    "data_address_range", "instr_address_range", "edge_detect", "invert",
+    "read_reset",
+))
+
+
+def _component_flags_source(missing):
+    """Return the C source of _papi_component_flags() and of the table of
+    flag names it packs."""
+    terms = ["(unsigned int)info->%s << %d" % (name, bit)
+             for bit, name in enumerate(_COMPONENT_FLAGS) if name not in missing]
+    names = ", ".join('"%s"' % name for name in _COMPONENT_FLAGS)
+    return ("\nstatic const char *const _papi_component_flag_names[] = { %s };\n"
+            "\nstatic unsigned int _papi_component_flags("
+            "const PAPI_component_info_t *info) {\n"
+            "    return %s;\n}\n" % (names, "\n         | ".join(terms)))
+
+
+def _clock_gettime_libraries():
+    """Return the libraries needed for clock_gettime.
+
+    It lives in libc since glibc 2.17; only older systems need librt. Try
+    linking a small program without it to find out.
+    """
+    cc = (sysconfig.get_config_var("CC") or "cc").split()
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "clock.c")
+        with open(src, "w") as f:
+            f.write("#include <time.h>\n"
+                    "int main(void) { struct timespec ts; "
+                    "return clock_gettime(CLOCK_MONOTONIC, &ts); }\n")
+        try:
+            result = subprocess.run(cc + [src, "-o", os.path.join(tmp, "clock")],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            return ["rt"]
+    return [] if result.returncode == 0 else ["rt"]
+
+
+# Optimize for the small hot paths (timer reads, per-event loops) and let
+# LTO inline papi_impl.c into the cffi wrappers. -march=native makes the
+# build unportable, so it is opt-in through LOW_LEVEL_PAPI_NATIVE=1.
+_EXTRA_COMPILE_ARGS = ["-O3", "-fno-plt", "-fno-semantic-interposition", "-flto"]
+_EXTRA_LINK_ARGS = ["-flto", "-Wl,-O1", "-Wl,--as-needed"]
+if os.environ.get("LOW_LEVEL_PAPI_NATIVE") == "1":
+    _EXTRA_COMPILE_ARGS.append("-march=native")
+
+if USE_EMBEDDED:
+    _papi_include = '#include "papi.h"\n'
+    _helpers = _HELPERS_SOURCE + _component_flags_source(())
+    _build_args = dict(
+        sources=[os.path.join(_EMBEDDED_PAPI_DIR, "papi_impl.c")],
+        include_dirs=[_ROOT],
+        libraries=_clock_gettime_libraries(),
+    )
+else:
+    # A field or function of papi_public.h that the installed papi.h lacks
+    # fails here rather than at run time
+    _papi_include = "#include <papi.h>\n"
+    _helpers = _HELPERS_SOURCE + _component_flags_source(_SYSTEM_MISSING_FLAGS)
+    _build_args = dict(libraries=["papi"])
+    _papi_dir = os.environ.get("PAPI_DIR")
+    if _papi_dir:
+        _build_args.update(
+            include_dirs=[os.path.join(_papi_dir, "include")],
+            library_dirs=[os.path.join(_papi_dir, "lib")],
+            runtime_library_dirs=[os.path.join(_papi_dir, "lib")],
+        )
 
 ffibuilder = FFI()
 ffibuilder.set_source(
     "low_level_papi._papi",
-    # Include directives
-    '#include "papi.h"',
-    # Now use our embedded implementation
-    sources=[os.path.join(_EMBEDDED_PAPI_DIR, "papi_impl.c")],
-    include_dirs=[_ROOT],
-    libraries=["rt"],  # Only the minimal required libraries
+    # Include directives and Python-side helpers
+    "#include <string.h>\n" + _papi_include + _helpers,
+    extra_compile_args=_EXTRA_COMPILE_ARGS,
+    extra_link_args=_EXTRA_LINK_ARGS,
+    **_build_args,
 )
-ffibuilder.cdef(open(_PAPI_H, "r").read())
+with open(_PAPI_H, "r") as f:
+    ffibuilder.cdef(f.read())
+ffibuilder.cdef("""
+int _papi_dump_consts(long long *out, int n);
+int _papi_read_n(int EventSet, long long *values, int max);
+int _papi_stop_n(int EventSet, long long *values, int max);
+int _papi_enum_all(int EventCode, int modifier, int *codes, int max, int *count);
+unsigned int _papi_component_flags(const PAPI_component_info_t *info);
+static const char *const _papi_component_flag_names[...];
+""")
 
 if __name__ == "__main__":
-    print("Building standalone _papi extension module")
+    print("Building _papi extension module against %s"
+          % ("the embedded implementation" if USE_EMBEDDED else "libpapi"))
     ffibuilder.compile(verbose=True)
@@ -0,0 +1,167 @@
+// The part of the PAPI API that Python uses, in cffi cdef syntax: the calls
+// core.py wraps, the error codes exceptions.py maps and the struct fields
+// Python reads. This is the only header passed to cffi's cdef, see
+// papi_build.py. Values, array sizes and struct layouts are written as "..."
+// and filled in by the compiler from papi.h, whether that is the embedded
+// papi_internal.h or an installed PAPI.
+
+// PAPI error codes
+#define PAPI_OK ...
+#define PAPI_EINVAL ...
+#define PAPI_ENOMEM ...
+#define PAPI_ESYS ...
+#define PAPI_ECMP ...
+#define PAPI_ECLOST ...
+#define PAPI_EBUG ...
+#define PAPI_ENOEVNT ...
+#define PAPI_ECNFLCT ...
+#define PAPI_ENOTRUN ...
+#define PAPI_EISRUN ...
+#define PAPI_ENOEVST ...
+#define PAPI_ENOTPRESET ...
+#define PAPI_ENOCNTR ...
+#define PAPI_EMISC ...
+#define PAPI_EPERM ...
+#define PAPI_ENOINIT ...
+#define PAPI_ENOCMP ...
+#define PAPI_ENOSUPP ...
+#define PAPI_ENOIMPL ...
+#define PAPI_EBUF ...
+#define PAPI_EINVAL_DOM ...
+#define PAPI_EATTR ...
+#define PAPI_ECOUNT ...
+#define PAPI_ECOMBO ...
+#define PAPI_ECMP_DISABLED ...
+
+// PAPI data structures. The component info flags are bitfields, which cffi
+// cannot declare in a partial struct; _papi_component_flags() reads them.
+typedef struct {
+    char name[...];
+    char short_name[...];
+    char description[...];
+    char version[...];
+    char support_version[...];
+    char kernel_version[...];
+    char disabled_reason[...];
+    int disabled;
+    int CmpIdx;
+    int num_cntrs;
+    int num_mpx_cntrs;
+    int num_preset_events;
+    int num_native_events;
+    int default_domain;
+    int available_domains;
+    int default_granularity;
+    int available_granularities;
+    int hardware_intr_sig;
+    char *pmu_names[...];
+    ...;
+} PAPI_component_info_t;
+
+typedef char *caddr_t;
+
+typedef struct {
+    char name[...];
+    caddr_t text_start;
+    caddr_t text_end;
+    caddr_t data_start;
+    caddr_t data_end;
+    caddr_t bss_start;
+    caddr_t bss_end;
+    ...;
+} PAPI_address_map_t;
+
+typedef struct {
+    char fullname[...];
+    PAPI_address_map_t address_info;
+    ...;
+} PAPI_exe_info_t;
+
+typedef struct {
+    long long peak;
+    long long size;
+    long long resident;
+    long long high_water_mark;
+    long long shared;
+    long long text;
+    long long library;
+    long long heap;
+    long long locked;
+    long long stack;
+    long long pagesize;
+    long long pte;
+    ...;
+} PAPI_dmem_info_t;
+
+typedef struct {
+    unsigned int event_code;
+    char symbol[...];
+    char short_descr[...];
+    char long_descr[...];
+    int component_index;
+    char units[...];
+    int location;
+    int data_type;
+    int value_type;
+    int timescope;
+    int update_type;
+    int update_freq;
+    unsigned int count;
+    unsigned int event_type;
+    char derived[...];
+    char postfix[...];
+    unsigned int code[...];
+    char name[...][...];
+    char note[...];
+    ...;
+} PAPI_event_info_t;
+
+// get_hardware_info() unpacks the fields up to cpu_min_mhz in one go, see
+// structs._HW_STRUCT
+typedef struct {
+    char vendor_string[...];
+    char model_string[...];
+    int cpu_min_mhz;
+    ...;
+} PAPI_hw_info_t;
+
+// PAPI LOW level API
+int PAPI_add_event(int EventSet, int Event);
+int PAPI_add_named_event(int EventSet, const char *EventName);
+int PAPI_add_events(int EventSet, int *Events, int number);
+int PAPI_cleanup_eventset(int EventSet);
+int PAPI_create_eventset(int *EventSet);
+int PAPI_destroy_eventset(int *EventSet);
+int PAPI_enum_event(int *EventCode, int modifier);
+int PAPI_event_code_to_name(int EventCode, char *out);
+int PAPI_event_name_to_code(const char *in, int *out);
+const PAPI_component_info_t *PAPI_get_component_info(int cidx);
+int PAPI_get_dmem_info(PAPI_dmem_info_t *dest);
+int PAPI_get_event_info(int EventCode, PAPI_event_info_t *info);
+const PAPI_exe_info_t *PAPI_get_executable_info(void);
+const PAPI_hw_info_t *PAPI_get_hardware_info(void);
+long long PAPI_get_real_cyc(void);
+long long PAPI_get_real_nsec(void);
+long long PAPI_get_real_usec(void);
+long long PAPI_get_virt_cyc(void);
+long long PAPI_get_virt_nsec(void);
+long long PAPI_get_virt_usec(void);
+int PAPI_is_initialized(void);
+int PAPI_library_init(int version);
+int PAPI_list_events(int EventSet, int *Events, int *number);
+int PAPI_num_events(int EventSet);
+int PAPI_read(int EventSet, long long *values);
+int PAPI_remove_event(int EventSet, int EventCode);
+int PAPI_remove_events(int EventSet, int *Events, int number);
+int PAPI_remove_named_event(int EventSet, const char *EventName);
+int PAPI_reset(int EventSet);
+void PAPI_shutdown(void);
+int PAPI_start(int EventSet);
+int PAPI_state(int EventSet, int *status);
+int PAPI_stop(int EventSet, long long *values);
+char *PAPI_strerror(int);
+int PAPI_num_components(void);
+int PAPI_flips_rate(int event, float *rtime, float *ptime, long long *flpins, float *mflips);
+int PAPI_flops_rate(int event, float *rtime, float *ptime, long long *flpops, float *mflops);
+int PAPI_epc(int event, float *rtime, float *ptime, long long *ref, long long *core, long long *evt, float *epc);
+int PAPI_ipc(float *rtime, float *ptime, long long *ins, float *ipc);
@@ -1,35 +1,103 @@
 """
-Data structures for the low_level_pipa module.
+Data structures for the low_level_papi module.
 """
+import struct
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional
 
+from ._papi import ffi
+from .consts import PAPI_MAX_STR_LEN
+
+
+class _Decoded:
+    """Field decoded from the wrapped event info on first access.
+
+    Only defines __get__, so the cached value stored in the instance
+    __dict__ takes precedence on later lookups.
+    """
+
+    def __init__(self, decode):
+        self.decode = decode
+        self.name = decode.__name__
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.decode(obj)
+        return value
 
-@dataclass
-class EVENT_info:
-    """Information about a PAPI event."""
-    event_code: int
-    symbol: str
-    short_descr: str
-    long_descr: str
-    component_index: int
-    units: str
-    location: int
-    data_type: int
-    value_type: int
-    timescope: int
-    update_type: int
-    update_freq: int
-    count: int
-    event_type: int
-    derived: str
-    postfix: str
-    code: List[int]
-    name: List[str]
-    note: str
 
+def _field_str(field):
+    def decode(self):
+        return ffi.string(getattr(self._info, field)).decode("ascii")
+    decode.__name__ = field
+    return _Decoded(decode)
 
-@dataclass
+
+def _field_int(field):
+    return property(lambda self: getattr(self._info, field))
+
+
+class EVENT_info:
+    """Information about a PAPI event.
+
+    Wraps the PAPI_event_info_t filled by PAPI_get_event_info. String and
+    list fields are decoded the first time they are read.
+    """
+
+    _FIELDS = (
+        "event_code", "symbol", "short_descr", "long_descr",
+        "component_index", "units", "location", "data_type", "value_type",
+        "timescope", "update_type", "update_freq", "count", "event_type",
+        "derived", "postfix", "code", "name", "note",
+    )
+
+    def __init__(self, info):
+        # info must be owned by the caller and not reused, as it is kept
+        # alive here and read lazily
+        self._info = info
+
+    event_code = _field_int("event_code")
+    symbol = _field_str("symbol")
+    short_descr = _field_str("short_descr")
+    long_descr = _field_str("long_descr")
+    component_index = _field_int("component_index")
+    units = _field_str("units")
+    location = _field_int("location")
+    data_type = _field_int("data_type")
+    value_type = _field_int("value_type")
+    timescope = _field_int("timescope")
+    update_type = _field_int("update_type")
+    update_freq = _field_int("update_freq")
+    count = _field_int("count")
+    event_type = _field_int("event_type")
+    derived = _field_str("derived")
+    postfix = _field_str("postfix")
+    note = _field_str("note")
+
+    @_Decoded
+    def code(self):
+        return ffi.unpack(self._info.code, self._info.count)
+
+    @_Decoded
+    def name(self):
+        names = self._info.name
+        return [ffi.string(names[i]).decode("ascii") for i in range(self._info.count)]
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self._FIELDS)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._FIELDS)
+        return f"EVENT_info({fields})"
+
+
+@dataclass(slots=True)
 class HARDWARE_info:
     """Information about the system hardware."""
     ncpu: int
@@ -50,7 +118,16 @@ class HARDWARE_info:
     cpu_min_mhz: int
 
 
-@dataclass
+# Scalar and string fields of PAPI_hw_info_t up to mem_hierarchy, in
+# declaration order
+_HW_STRUCT = struct.Struct("@7i%dsi%dsf5i" % (PAPI_MAX_STR_LEN, PAPI_MAX_STR_LEN))
+# A header whose fields no longer match the format would be misparsed
+# silently, so compare against the layout the extension was built with
+if _HW_STRUCT.size != ffi.offsetof("PAPI_hw_info_t", "cpu_min_mhz") + ffi.sizeof("int"):
+    raise ImportError("PAPI_hw_info_t layout does not match structs._HW_STRUCT")
+
+
+@dataclass(slots=True)
 class DMEM_info:
     """Dynamic memory usage information."""
     peak: int
@@ -67,14 +144,14 @@ class DMEM_info:
     pte: int
 
 
-@dataclass
+@dataclass(slots=True)
 class EXECUTABLE_info:
     """Information about the executable."""
     fullname: str
     address_info: Dict[str, int]
 
 
-@dataclass
+@dataclass(slots=True)
 class COMPONENT_info:
     """Information about a PAPI component."""
     name: str
@@ -116,15 +193,14 @@ class COMPONENT_info:
     cntr_umasks: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class SHARED_LIB_info:
     """Information about shared libraries."""
     count: int
     map_: List[Dict[str, int]]
 
 
-@dataclass
-class Flips:
+class Flips(NamedTuple):
     """Result of the flips function."""
     event_name: str
     real_time: float
@@ -133,8 +209,7 @@ class Flips:
     mflips: float
 
 
-@dataclass
-class Flops:
+class Flops(NamedTuple):
     """Result of the flops function."""
     event_name: str
     real_time: float
@@ -143,8 +218,7 @@ class Flops:
     mflops: float
 
 
-@dataclass
-class IPC:
+class IPC(NamedTuple):
     """Result of the ipc function."""
     real_time: float
     proc_time: float
@@ -152,8 +226,7 @@ class IPC:
     ipc: float
 
 
-@dataclass
-class EPC:
+class EPC(NamedTuple):
     """Result of the epc function."""
     real_time: float
     proc_time: float
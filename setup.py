@@ -15,24 +15,27 @@ setup(
     author_email="pipa@example.com",
     url="https://github.com/your-organization/low_level_pipa",
     packages=find_packages(),
+    package_data={"low_level_papi": ["_papi.pxd", "papi.h", "papi_public.h", "papi_internal.h"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
         "Intended Audience :: Science/Research",
         "License :: OSI Approved :: BSD License",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "Topic :: Software Development :: Libraries :: Python Modules",
         "Topic :: System :: Hardware",
         "Topic :: System :: Monitoring",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.10",
     install_requires=[
         "cffi>=1.0.0",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     setup_requires=["cffi>=1.0.0"],
-    cffi_modules=["low_level_pipa/papi_build.py:ffibuilder"],
+    cffi_modules=["low_level_papi/papi_build.py:ffibuilder"],
 )